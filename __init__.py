@@ -1,21 +1,30 @@
 """Klarta Humea Integration - v4.0 FINAL - With SELECT for Fan Speed"""
 
+from __future__ import annotations
+
 import logging
 
-from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import Platform
-from homeassistant.core import HomeAssistant
+try:
+    from homeassistant.config_entries import ConfigEntry
+    from homeassistant.const import Platform
+    from homeassistant.core import HomeAssistant
+    from homeassistant.helpers.dispatcher import async_dispatcher_send
+
+    PLATFORMS = [
+        Platform.SWITCH,
+        Platform.HUMIDIFIER,
+        Platform.SENSOR,
+        Platform.SELECT,
+    ]
+except ImportError:
+    # Standalone use (python -m klarta_humea) - Home Assistant not installed
+    PLATFORMS = []
 
 _LOGGER = logging.getLogger(__name__)
 
 DOMAIN = "klarta_humea"
 
-PLATFORMS = [
-    Platform.SWITCH,
-    Platform.HUMIDIFIER,
-    Platform.SENSOR,
-    Platform.SELECT,
-]
+SIGNAL_OPTIONS_UPDATED = "klarta_humea_options_updated_{}"
 
 
 async def async_setup(hass: HomeAssistant, config: dict) -> bool:
@@ -39,11 +48,70 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     _LOGGER.info(f"Protocol: {entry.data.get('protocol_version', '3.4')}")
     _LOGGER.info("-" * 60)
 
+    device_manager = _get_device_manager(entry)
+    device_manager.apply_options(entry.options)
+    await _async_update_gateway(device_manager, entry.options)
+    await _async_update_telemetry(hass, device_manager, entry.options)
+    entry.async_on_unload(entry.add_update_listener(_async_options_updated))
+
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
     return True
 
 
+def _get_device_manager(entry: ConfigEntry):
+    from .device_manager_v5_7_FINAL import PersistentDeviceManager
+
+    return PersistentDeviceManager(
+        entry.data["device_id"],
+        entry.data["local_key"],
+        entry.data.get("ip_address"),
+        entry.data.get("protocol_version", "3.4")
+    )
+
+
+async def _async_options_updated(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Apply new options live - no reload, no reconnect."""
+    device_manager = _get_device_manager(entry)
+    device_manager.apply_options(entry.options)
+    await _async_update_gateway(device_manager, entry.options)
+    await _async_update_telemetry(hass, device_manager, entry.options)
+    async_dispatcher_send(hass, SIGNAL_OPTIONS_UPDATED.format(entry.entry_id), dict(entry.options))
+
+
+async def _async_update_gateway(device_manager, options) -> None:
+    """Start, move or stop the local gateway to match the options."""
+    from .const import DEFAULT_GATEWAY_HOST, DEFAULT_GATEWAY_PORT
+
+    if not options.get("gateway_enabled", False):
+        await device_manager.stop_gateway()
+        return
+
+    try:
+        await device_manager.start_gateway(
+            options.get("gateway_host", DEFAULT_GATEWAY_HOST),
+            int(options.get("gateway_port", DEFAULT_GATEWAY_PORT)),
+        )
+    except OSError as e:
+        _LOGGER.error(f"❌ Gateway could not start: {e}")
+
+
+async def _async_update_telemetry(hass: HomeAssistant, device_manager, options) -> None:
+    """Start, move or stop the telemetry export to match the options."""
+    from .const import DEFAULT_TELEMETRY_DIR
+
+    if not options.get("telemetry_enabled", False):
+        await device_manager.stop_telemetry()
+        return
+
+    try:
+        await device_manager.start_telemetry(
+            hass.config.path(options.get("telemetry_dir", DEFAULT_TELEMETRY_DIR))
+        )
+    except OSError as e:
+        _LOGGER.error(f"❌ Telemetry export could not start: {e}")
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload entry."""
 
@@ -51,5 +119,7 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
     if result:
         hass.data[DOMAIN].pop(entry.entry_id)
+        await _get_device_manager(entry).stop_gateway()
+        await _get_device_manager(entry).stop_telemetry()
 
     return result
@@ -0,0 +1,7 @@
+"""Standalone entry point - python -m klarta_humea"""
+
+import sys
+
+from .cli import main
+
+sys.exit(main())
@@ -0,0 +1 @@
+"""Benchmarks and harnesses - run with python -m klarta_humea.benchmarks.<name>"""
@@ -0,0 +1,162 @@
+"""Codec Benchmark - v1.0 - tuya_codec vs tinytuya vs naive slicing
+
+    python -m klarta_humea.benchmarks.bench_codec
+    python -m klarta_humea.benchmarks.bench_codec --trace klarta_trace.jsonl.gz --version 3.3
+
+Frames are built from Klarta responses - the built-in samples (wrapped,
+direct and 1-DP partial formats) or the raw responses of a traffic
+recorder trace - and concatenated into one device stream. Each decoder
+consumes the stream in TCP-sized reads, so several frames per read and
+frames split across reads both occur. tinytuya is only measured when it
+is installed.
+"""
+
+import argparse
+import gzip
+import hashlib
+import hmac
+import json
+import struct
+import sys
+import time
+import tracemalloc
+import zlib
+
+from ..tuya_codec import FrameDecoder, FrameEncoder, PREFIX_55AA_BYTES, SUFFIX_55AA
+
+BENCH_KEY = b"0123456789abcdef"
+
+KLARTA_RESPONSES = [
+    {"protocol": 4, "t": 1700000000, "data": {"dps": {"1": True, "10": 21, "14": 48, "16": False,
+                                                       "101": "55RH", "102": "Water_enough", "103": "Low_speed"}},
+     "dps": {"1": True, "10": 21, "14": 48}},
+    {"dps": {"1": True, "10": 21, "14": 48, "16": False, "101": "55RH", "102": "Water_enough", "103": "Low_speed"}},
+    {"dps": {"14": 49}},
+]
+
+
+def load_payloads(trace: str):
+    if not trace:
+        return [json.dumps(r, separators=(",", ":")).encode() for r in KLARTA_RESPONSES]
+    opener = gzip.open if trace.endswith(".gz") else open
+    payloads = []
+    with opener(trace, "rt", encoding="utf-8") as f:
+        for line in f:
+            entry = json.loads(line)
+            if isinstance(entry.get("r"), dict):
+                payloads.append(json.dumps(entry["r"], separators=(",", ":")).encode())
+    return payloads or load_payloads("")
+
+
+def build_stream(version: float, payloads, frames: int) -> bytes:
+    encoder = FrameEncoder(version, BENCH_KEY)
+    return b"".join(
+        encoder.encode(seqno, 8, payloads[seqno % len(payloads)], retcode=0) for seqno in range(frames)
+    )
+
+
+def decode_codec(stream: bytes, version: float, read_size: int) -> int:
+    decoder = FrameDecoder(version, BENCH_KEY)
+    count = 0
+    view = memoryview(stream)
+    for pos in range(0, len(stream), read_size):
+        chunk = view[pos:pos + read_size]
+        buf = decoder.recv_buffer(len(chunk))
+        buf[:len(chunk)] = chunk
+        decoder.commit(len(chunk))
+        for frame in decoder.frames():
+            count += frame.verified is not False
+    return count
+
+
+def decode_naive(stream: bytes, version: float, read_size: int) -> int:
+    """Slice-and-copy decoder, the way most ad-hoc Tuya parsers are written (3.3 CRC only)"""
+    buffer = b""
+    count = 0
+    check = 32 if version >= 3.4 else 4
+    for pos in range(0, len(stream), read_size):
+        buffer += stream[pos:pos + read_size]
+        while len(buffer) >= 16:
+            start = buffer.find(PREFIX_55AA_BYTES)
+            if start < 0:
+                buffer = buffer[-3:]
+                break
+            buffer = buffer[start:]
+            header = buffer[:16]
+            _, seqno, cmd, length = struct.unpack(">IIII", header)
+            if len(buffer) < 16 + length:
+                break
+            frame = buffer[:16 + length]
+            buffer = buffer[16 + length:]
+            body = frame[:-(4 + check)]
+            payload = body[20:]
+            suffix = struct.unpack(">I", frame[-4:])[0]
+            if check == 4:
+                ok = zlib.crc32(body) & 0xFFFFFFFF == struct.unpack(">I", frame[-8:-4])[0]
+            else:
+                ok = hmac.new(BENCH_KEY, body, hashlib.sha256).digest() == frame[-36:-4]
+            count += ok and suffix == SUFFIX_55AA and len(payload) >= 0
+    return count
+
+
+def decode_tinytuya(stream: bytes, version: float, read_size: int) -> int:
+    import tinytuya
+
+    key = BENCH_KEY if version >= 3.4 else None
+    buffer = b""
+    count = 0
+    for pos in range(0, len(stream), read_size):
+        buffer += stream[pos:pos + read_size]
+        while len(buffer) >= 16:
+            length = struct.unpack(">I", buffer[12:16])[0]
+            if len(buffer) < 16 + length:
+                break
+            msg = tinytuya.unpack_message(buffer[:16 + length], hmac_key=key)
+            buffer = buffer[16 + length:]
+            count += bool(msg.crc_good)
+    return count
+
+
+def measure(func, stream, version, read_size, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        count = func(stream, version, read_size)
+        best = min(best, time.perf_counter() - started)
+    tracemalloc.start()
+    func(stream, version, read_size)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return count, best, peak
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark Tuya frame decoders on Klarta frames")
+    parser.add_argument("--version", type=float, default=3.4, choices=[3.3, 3.4])
+    parser.add_argument("--frames", type=int, default=20000)
+    parser.add_argument("--read-size", type=int, default=1460, help="bytes per simulated TCP read")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--trace", default="", help="traffic recorder trace to take payloads from")
+    args = parser.parse_args(argv)
+
+    payloads = load_payloads(args.trace)
+    stream = build_stream(args.version, payloads, args.frames)
+    decoders = [("tuya_codec", decode_codec), ("naive", decode_naive)]
+    try:
+        import tinytuya  # noqa: F401
+
+        decoders.append(("tinytuya", decode_tinytuya))
+    except ImportError:
+        print("tinytuya not installed - skipping its decoder", file=sys.stderr)
+
+    print(f"protocol {args.version}: {args.frames} frames, {len(stream)} bytes, {args.read_size}-byte reads")
+    print(f"{'decoder':<12} {'frames':>8} {'µs/frame':>10} {'MB/s':>8} {'peak KiB':>9}")
+    for name, func in decoders:
+        count, best, peak = measure(func, stream, args.version, args.read_size, args.repeat)
+        print(f"{name:<12} {count:>8} {best / args.frames * 1e6:>10.2f} "
+              f"{len(stream) / best / 1e6:>8.1f} {peak / 1024:>9.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
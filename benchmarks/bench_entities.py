@@ -0,0 +1,280 @@
+"""Entity Benchmark - v1.0 - Per-update CPU and allocation cost of the entity layer
+
+    python -m klarta_humea.benchmarks.bench_entities
+    python -m klarta_humea.benchmarks.bench_entities --scenarios hit miss --cycles 50000 --json
+
+One cycle updates all seven Klarta entities (humidifier, three sensors, two
+switches, fan speed select) once, the way Home Assistant's poller does:
+async_update() followed by async_write_ha_state() for every entity, as in
+async_update_ha_state(force_refresh=True).
+The manager is a stub answering from memory, so only entity code is
+measured: DP lookups and parsing, the f-string log lines and
+async_write_ha_state (replaced by a stub that reads the state properties
+like Home Assistant does). Home Assistant itself is stubbed when it is not
+installed.
+
+    hit      get_status() returns the cached snapshot without suspending
+    miss     get_status() yields to the loop and returns a fresh snapshot
+    invalid  get_status() returns None (warning path)
+    error    get_status() raises (error log)
+    timeout  get_status() raises asyncio.TimeoutError
+    write    one command per writable entity, all succeeding
+
+Log records at --log-level (WARNING, Home Assistant's default) are built
+and formatted as in production, then discarded.
+"""
+
+import argparse
+import asyncio
+import importlib
+import json
+import logging
+import sys
+import time
+import tracemalloc
+import types
+
+SCENARIOS = ["hit", "miss", "invalid", "error", "timeout", "write"]
+
+KLARTA_DPS = {
+    "1": True,
+    "10": 21,
+    "14": 48,
+    "16": False,
+    "101": "55RH",
+    "102": "Water_enough",
+    "103": "Low_speed",
+}
+
+# What Home Assistant reads from each entity when it writes the state
+STATE_PROPERTIES = ("available", "name", "unique_id", "is_on", "current_humidity", "target_humidity",
+                    "native_value", "current_option")
+
+
+def _install_ha_stubs():
+    """Minimal homeassistant modules - just what the platform modules import"""
+    try:
+        import homeassistant  # noqa: F401
+        return False
+    except ImportError:
+        pass
+
+    def module(name, **attrs):
+        mod = types.ModuleType(name)
+        mod.__dict__.update(attrs)
+        sys.modules[name] = mod
+        return mod
+
+    class Entity:
+        hass = None
+
+        def async_write_ha_state(self):
+            pass
+
+        def async_on_remove(self, func):
+            pass
+
+    def enum(name, *members):
+        return type(name, (), {m: m.lower() for m in members})
+
+    module("homeassistant")
+    module("homeassistant.components")
+    module("homeassistant.components.humidifier",
+           HumidifierEntity=type("HumidifierEntity", (Entity,), {}),
+           HumidifierDeviceClass=enum("HumidifierDeviceClass", "HUMIDIFIER", "DEHUMIDIFIER"))
+    module("homeassistant.components.sensor",
+           SensorEntity=type("SensorEntity", (Entity,), {}),
+           SensorDeviceClass=enum("SensorDeviceClass", "HUMIDITY", "TEMPERATURE"),
+           SensorStateClass=enum("SensorStateClass", "MEASUREMENT"))
+    module("homeassistant.components.switch", SwitchEntity=type("SwitchEntity", (Entity,), {}))
+    module("homeassistant.components.select", SelectEntity=type("SelectEntity", (Entity,), {}))
+    module("homeassistant.config_entries", ConfigEntry=object)
+    module("homeassistant.core", HomeAssistant=object, callback=lambda func: func)
+    module("homeassistant.helpers")
+    module("homeassistant.helpers.dispatcher", async_dispatcher_connect=lambda hass, signal, target: None)
+    module("homeassistant.helpers.entity_platform", AddEntitiesCallback=object)
+    return True
+
+
+class StubManager:
+    """Answers get_status()/set_value() from memory according to the scenario"""
+
+    def __init__(self, device_id: str = "bench"):
+        self.device_id = device_id
+        self.entity_timeout = 5.0
+        self.available = True
+        self.scenario = "hit"
+        self.writes = 0
+        self._cached = {"dps": dict(KLARTA_DPS)}
+        self._polls = 0
+
+    async def get_status(self):
+        scenario = self.scenario
+        if scenario == "hit":
+            return self._cached
+        if scenario == "miss":
+            await asyncio.sleep(0)
+            self._polls += 1
+            dps = dict(KLARTA_DPS)
+            dps["14"] = 45 + self._polls % 7
+            dps["10"] = 20 + self._polls % 3
+            self._cached = {"dps": dps}
+            return self._cached
+        if scenario == "invalid":
+            return None
+        if scenario == "error":
+            raise RuntimeError("Device not initialized")
+        raise asyncio.TimeoutError()
+
+    async def set_value(self, dp: str, value) -> bool:
+        self.writes += 1
+        return True
+
+
+def build_entities(manager):
+    package = __package__.rsplit(".", 1)[0]
+    humidifier = importlib.import_module(f"{package}.humidifier")
+    sensor = importlib.import_module(f"{package}.sensor")
+    switch = importlib.import_module(f"{package}.switch")
+    select = importlib.import_module(f"{package}.select")
+
+    options = {}
+    signal = sensor.SIGNAL_OPTIONS_UPDATED.format("bench")
+    entities = [
+        humidifier.KlartaHumeaHumidifier(None, manager, "Bench"),
+        sensor.HumiditySensor(manager, "Bench Current Humidity", options, signal),
+        sensor.TemperatureSensor(manager, "Bench Temperature", options, signal),
+        sensor.WaterLevelSensor(manager, "Bench Water Level"),
+        switch.KlartaHumeaPowerSwitch(None, manager, "Bench Power", switch.DP_POWER),
+        switch.KlartaHueaNightModeSwitch(None, manager, "Bench Night Mode", switch.DP_NIGHT_MODE),
+        select.KlartaHueaFanSpeed(None, manager, "Bench Fan Speed", select.DP_FAN_SPEED),
+    ]
+
+    counter = {"state_writes": 0}
+    for entity in entities:
+        props = [p for p in STATE_PROPERTIES if hasattr(type(entity), p)]
+
+        def write_state(entity=entity, props=props):
+            counter["state_writes"] += 1
+            for prop in props:
+                getattr(entity, prop)
+
+        entity.async_write_ha_state = write_state
+
+    humidifier_entity, _, _, _, power, night, fan = entities
+    writes = [
+        lambda i: humidifier_entity.async_set_humidity(45 + i % 20),
+        lambda i: power.async_turn_on() if i % 2 else power.async_turn_off(),
+        lambda i: night.async_turn_off() if i % 2 else night.async_turn_on(),
+        lambda i: fan.async_select_option(select.FAN_SPEED_OPTIONS[i % 4]),
+    ]
+    return entities, writes, counter
+
+
+class CountingHandler(logging.Handler):
+    """Formats every record like a real handler, counts it, writes nothing"""
+
+    def __init__(self, level):
+        super().__init__(level)
+        self.records = 0
+        self.setFormatter(logging.Formatter("%(asctime)s %(levelname)s (%(threadName)s) [%(name)s] %(message)s"))
+
+    def emit(self, record):
+        self.records += 1
+        self.format(record)
+
+
+async def run_cycles(entities, writes, scenario: str, cycles: int):
+    if scenario == "write":
+        for i in range(cycles):
+            for write in writes:
+                await write(i)
+        return
+    for _ in range(cycles):
+        for entity in entities:
+            # async_update_ha_state(force_refresh=True): update, then always write
+            await entity.async_update()
+            entity.async_write_ha_state()
+
+
+async def measure(scenario: str, cycles: int, repeat: int, handler: CountingHandler) -> dict:
+    manager = StubManager()
+    manager.scenario = scenario
+    entities, writes, counter = build_entities(manager)
+    per_cycle = len(writes) if scenario == "write" else len(entities)
+
+    # Warm up (first-time imports, regex cache, interned strings)
+    await run_cycles(entities, writes, scenario, min(cycles, 100))
+
+    best = float("inf")
+    for _ in range(repeat):
+        counter["state_writes"] = 0
+        handler.records = 0
+        started = time.perf_counter()
+        await run_cycles(entities, writes, scenario, cycles)
+        best = min(best, time.perf_counter() - started)
+    state_writes, records = counter["state_writes"], handler.records
+
+    # Allocations: per-cycle high-water mark above the pre-cycle baseline
+    alloc_cycles = max(1, min(cycles, 2000))
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    peaks = 0
+    for i in range(alloc_cycles):
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        await run_cycles(entities, writes, scenario, 1)
+        peaks += tracemalloc.get_traced_memory()[1] - before
+    retained = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+
+    return {
+        "scenario": scenario,
+        "us_cycle": round(best / cycles * 1e6, 2),
+        "us_call": round(best / cycles / per_cycle * 1e6, 2),
+        "peak_b_cycle": round(peaks / alloc_cycles),
+        "retained_b": retained,
+        "state_writes": round(state_writes / cycles, 2),
+        "log_records": round(records / cycles, 2),
+    }
+
+
+def print_table(results, out=sys.stdout):
+    columns = ["scenario", "us_cycle", "us_call", "peak_b_cycle", "retained_b", "state_writes", "log_records"]
+    print(" ".join(f"{c:>13}" for c in columns), file=out)
+    for result in results:
+        print(" ".join(f"{result[c]!s:>13}" for c in columns), file=out)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the per-update cost of the Klarta entities")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument("--cycles", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--log-level", default="WARNING",
+                        choices=["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"])
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args(argv)
+
+    stubbed = _install_ha_stubs()
+    print(f"Home Assistant {'stubbed' if stubbed else 'installed'}, log level {args.log_level}", file=sys.stderr)
+
+    handler = CountingHandler(args.log_level)
+    root = logging.getLogger()
+    root.handlers[:] = [handler]
+    root.setLevel(args.log_level)
+
+    async def run_all():
+        return [await measure(s, args.cycles, args.repeat, handler) for s in args.scenarios]
+
+    results = asyncio.run(run_all())
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_table(results)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,284 @@
+"""Pipeline Harness - v1.0 - Request pipelining against an in-memory transport
+
+    python -m klarta_humea.benchmarks.bench_pipeline
+    python -m klarta_humea.benchmarks.bench_pipeline --requests 5000 --threads 16 --latency 0.02
+
+FakeTransport frames requests like a Tuya device: every request gets a
+sequence number, replies come back out of order after a random delay and
+writes are followed by a status push (sequence number 0). Checked:
+
+    mismatched      a request got the reply to another request
+    lost_pushes     a push did not reach on_unsolicited (or leaked into a reply)
+    close_not_fail  a pending request survived close(), or submit() worked after it
+    send_not_closed a failed send left the pipeline open or pending requests hanging
+    no_reconnect    the manager kept using a pipeline whose send failed
+
+Then one manager polls and writes through the pipeline and the same load
+runs without it, to show what several frames in flight buy per socket.
+Exits 1 when any check fails.
+"""
+
+import argparse
+import asyncio
+import heapq
+import json
+import logging
+import queue
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from ..device_manager_v5_7_FINAL import PersistentDeviceManager
+from ..pipeline import PipelineClosed, RequestPipeline
+from .fault_proxy import KLARTA_DPS
+
+PIPELINE_OPTIONS = {
+    "min_cache_interval": 0.0,
+    "cache_validity": 0.0,
+    "status_timeout": 5.0,
+    "set_timeout": 5.0,
+    "write_coalesce_window": 0.0,
+}
+
+
+class FakeTransport:
+    """In-memory framing - answers out of order after a random delay"""
+
+    def __init__(self, dps: dict, latency: float, seed: int = 0):
+        self.dps = dps
+        self.latency = latency
+        self.silent = False
+        self.fail_sends = False
+        self.closed = False
+        self.sent = 0
+        self.pushes = 0
+        self._rng = random.Random(seed)
+        self._seqno = 1
+        self._frames = queue.Queue()
+        self._due = []
+        self._cond = threading.Condition()
+        self._device = threading.Thread(target=self._device_loop, name="fake-device", daemon=True)
+        self._device.start()
+
+    def next_seqno(self) -> int:
+        return self._seqno
+
+    def send(self, op: str, args: tuple):
+        if self.fail_sends or self.closed:
+            raise ConnectionResetError("connection reset by peer")
+        seqno, self._seqno = self._seqno, self._seqno + 1
+        self.sent += 1
+        if self.silent:
+            return
+        with self._cond:
+            heapq.heappush(self._due, (time.monotonic() + self._rng.uniform(0, 2 * self.latency), seqno, op, args))
+            self._cond.notify()
+
+    def receive(self):
+        try:
+            return self._frames.get(timeout=0.1)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self.closed = True
+        with self._cond:
+            self._cond.notify()
+
+    def _device_loop(self):
+        while not self.closed:
+            with self._cond:
+                if not self._due:
+                    self._cond.wait(0.1)
+                    continue
+                wait = self._due[0][0] - time.monotonic()
+                if wait > 0:
+                    self._cond.wait(wait)
+                    continue
+                _, seqno, op, args = heapq.heappop(self._due)
+            self._answer(seqno, op, args)
+
+    def _answer(self, seqno: int, op: str, args: tuple):
+        if op == "status":
+            token = args[0] if args else None
+            self._frames.put((seqno, 10, {"dps": dict(self.dps), "token": token}))
+        elif op == "set_value":
+            self.dps[str(args[0])] = args[1]
+            # Ack with an empty payload, the new state follows as a push
+            self._frames.put((seqno, 7, {}))
+            self.pushes += 1
+            self._frames.put((0, 8, {"dps": {str(args[0]): args[1]}}))
+        else:
+            self._frames.put((seqno, 9, {}))
+
+
+class PipelinedDevice:
+    """tinytuya.Device stand-in offering a FakeTransport for pipelining"""
+
+    def __init__(self, dps: dict, latency: float):
+        self.dps = dps
+        self.latency = latency
+        self.transport = None
+        self._lock = threading.Lock()
+
+    def status(self):
+        time.sleep(self.latency)
+        return {"dps": dict(self.dps)}
+
+    def set_value(self, dp, value):
+        time.sleep(self.latency)
+        self.dps[str(dp)] = value
+        return {"dps": {str(dp): value}}
+
+    def heartbeat(self):
+        time.sleep(self.latency)
+        return {}
+
+    def pipeline_transport(self):
+        self.transport = FakeTransport(self.dps, self.latency)
+        return self.transport
+
+    def close(self):
+        if self.transport is not None:
+            self.transport.close()
+
+    def set_socketPersistent(self, persist):
+        pass
+
+    def set_socketNODELAY(self, nodelay):
+        pass
+
+
+def check_matching(args) -> dict:
+    transport = FakeTransport(dict(KLARTA_DPS), args.latency, seed=1)
+    pushed = []
+    pipeline = RequestPipeline(transport, pushed.append)
+    mismatched = leaked = 0
+    lock = threading.Lock()
+
+    def one(index: int):
+        nonlocal mismatched, leaked
+        if index % 4 == 0:
+            reply = pipeline.request("set_value", "103", f"v{index}", timeout=5.0)
+            bad = reply != {}
+        else:
+            reply = pipeline.request("status", index, timeout=5.0)
+            bad = reply.get("token") != index
+        with lock:
+            mismatched += bad
+            leaked += "token" not in reply and reply != {}
+
+    started = time.monotonic()
+    with ThreadPoolExecutor(args.threads) as pool:
+        list(pool.map(one, range(args.requests)))
+    elapsed = time.monotonic() - started
+    time.sleep(2 * args.latency + 0.2)
+    pipeline.close()
+    return {
+        "requests": args.requests,
+        "requests_per_s": round(args.requests / elapsed, 1),
+        "in_flight_peak": pipeline.in_flight_peak,
+        "mismatched": mismatched,
+        "lost_pushes": transport.pushes - len(pushed) + leaked,
+    }
+
+
+def check_close(args) -> dict:
+    transport = FakeTransport(dict(KLARTA_DPS), args.latency)
+    pipeline = RequestPipeline(transport)
+    transport.silent = True
+    futures = [pipeline.submit("status", i) for i in range(8)]
+    pipeline.close()
+    survived = sum(not f.done() or not isinstance(f.exception(timeout=0), PipelineClosed) for f in futures)
+    try:
+        pipeline.submit("status", 99)
+        survived += 1
+    except PipelineClosed:
+        pass
+
+    transport = FakeTransport(dict(KLARTA_DPS), args.latency)
+    pipeline = RequestPipeline(transport)
+    transport.silent = True
+    futures = [pipeline.submit("status", i) for i in range(8)]
+    transport.fail_sends = True
+    send_failures = 0
+    try:
+        pipeline.submit("status", 8)
+    except PipelineClosed:
+        pass
+    else:
+        send_failures += 1
+    send_failures += not pipeline.closed
+    send_failures += sum(not f.done() for f in futures)
+    return {"close_not_fail": survived, "send_not_closed": send_failures}
+
+
+async def run_manager(args, pipelining: bool) -> dict:
+    dps = dict(KLARTA_DPS)
+    devices = []
+
+    def factory():
+        devices.append(PipelinedDevice(dps, args.latency))
+        return devices[-1]
+
+    manager = PersistentDeviceManager(f"pipeline-{time.monotonic_ns()}", "key", "127.0.0.1")
+    manager.set_device_factory(factory)
+    manager.apply_options({**PIPELINE_OPTIONS, "pipelining": pipelining})
+
+    async def op(index: int):
+        if index % 4 == 0:
+            return await manager.set_value("103", f"v{index}")
+        return bool(await manager.get_status())
+
+    await manager.get_status()
+    started = time.monotonic()
+    results = await asyncio.gather(*(op(i) for i in range(args.manager_ops)))
+    elapsed = time.monotonic() - started
+    result = {"ops_per_s": round(len(results) / elapsed, 1), "failed": results.count(False)}
+
+    if pipelining:
+        pipeline = manager._pipeline
+        reconnects = manager.stats["reconnects"]
+        devices[-1].transport.fail_sends = True
+        await manager.get_status()
+        result["no_reconnect"] = int(
+            manager.stats["reconnects"] == reconnects or manager._pipeline is pipeline
+            or manager._pipeline is None or manager._pipeline.closed
+        )
+    await asyncio.to_thread(manager.set_device_factory, None)
+    for device in devices:
+        device.close()
+    return result
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Check request pipelining against an in-memory transport")
+    parser.add_argument("--requests", type=int, default=2000, help="requests for the matching check")
+    parser.add_argument("--threads", type=int, default=8, help="threads submitting requests")
+    parser.add_argument("--latency", type=float, default=0.01, help="mean device response time (s)")
+    parser.add_argument("--manager-ops", type=int, default=200, help="concurrent manager calls per run")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    parser.add_argument("-v", "--verbose", action="store_true")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.CRITICAL, stream=sys.stderr)
+    result = {
+        **check_matching(args),
+        **check_close(args),
+        "manager_pipelined": asyncio.run(run_manager(args, True)),
+        "manager_serial": asyncio.run(run_manager(args, False)),
+    }
+    result["no_reconnect"] = result["manager_pipelined"].pop("no_reconnect")
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        for key, value in result.items():
+            print(f"{key:<20} {value}")
+    violations = ("mismatched", "lost_pushes", "close_not_fail", "send_not_closed", "no_reconnect")
+    return 1 if any(result[k] for k in violations) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,187 @@
+"""Recovery Benchmark - v1.0 - Time to recover under injected network faults
+
+    python -m klarta_humea.benchmarks.bench_recovery
+    python -m klarta_humea.benchmarks.bench_recovery --scenarios half_open rst --fault-seconds 10 --json
+    python -m klarta_humea.benchmarks.bench_recovery --hot-standby
+
+Each scenario runs a fresh manager against DeviceStandIn through FaultProxy:
+warm up healthy, inject the fault, heal, and wait until a fresh status
+arrives again. Reported per scenario:
+
+    recover_s   heal -> first fresh status
+    stale_s     last fresh status before the fault -> first fresh after heal
+    wasted      device requests that produced no fresh data (fault start -> recovery)
+    reconnects  reconnects triggered by the manager
+    empty       get_status() calls that returned nothing at all
+    failover_ms slowest connection replacement (rebuild, or standby swap with --hot-standby)
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+
+from ..device_manager_v5_7_FINAL import PersistentDeviceManager
+from ..gateway import GatewayDevice
+from .fault_proxy import DeviceStandIn, FaultProxy
+
+SCENARIOS = {
+    "latency": {"latency": 1.5},
+    "drop": {"drop": 0.5},
+    "half_open": {"half_open": True},
+    "rst": {"rst": True},
+    "force_914": {"force_914": True},
+}
+
+# Short timeouts so a scenario takes seconds, not minutes
+BENCH_OPTIONS = {
+    "status_timeout": 1.0,
+    "set_timeout": 1.0,
+    "socket_timeout": 1.0,
+    "cache_validity": 0.5,
+    "min_cache_interval": 0.25,
+}
+
+REQUEST_KEYS = ("status_requests", "selective_requests", "set_requests")
+OK_KEYS = ("status_ok", "set_ok")
+
+
+def _requests(stats: dict) -> int:
+    return sum(stats[k] for k in REQUEST_KEYS)
+
+
+def _oks(stats: dict) -> int:
+    return sum(stats[k] for k in OK_KEYS)
+
+
+async def run_scenario(name: str, fault: dict, warmup: float, fault_seconds: float,
+                       poll_interval: float, max_recovery: float, hot_standby: bool = False) -> dict:
+    device = DeviceStandIn()
+    await device.start()
+    proxy = FaultProxy("127.0.0.1", device.port)
+    await proxy.start()
+
+    manager = PersistentDeviceManager(f"bench-{name}-{time.monotonic_ns()}", "key", "127.0.0.1")
+    manager.set_device_factory(GatewayDevice.factory("127.0.0.1", proxy.port, timeout=1.0))
+    manager.apply_options({**BENCH_OPTIONS, "hot_standby": hot_standby})
+
+    empty = 0
+    last_fresh = 0.0
+    stop = asyncio.Event()
+
+    async def poller():
+        nonlocal empty, last_fresh
+        while not stop.is_set():
+            try:
+                data = await asyncio.wait_for(manager.get_status(), timeout=5.0)
+                if not data:
+                    empty += 1
+            except asyncio.TimeoutError:
+                empty += 1
+            last_fresh = max(last_fresh, manager._cache_time)
+            await asyncio.sleep(poll_interval)
+
+    async def writer():
+        speeds = ["Low_speed", "Medium_speed", "High_speed"]
+        i = 0
+        while not stop.is_set():
+            i += 1
+            try:
+                await asyncio.wait_for(manager.set_value("103", speeds[i % 3]), timeout=5.0)
+            except asyncio.TimeoutError:
+                pass
+            await asyncio.sleep(1.0)
+
+    tasks = [asyncio.create_task(poller()), asyncio.create_task(writer())]
+    try:
+        await asyncio.sleep(warmup)
+        fresh_before_fault = last_fresh
+        before = dict(manager.stats)
+        manager.failover_times.clear()
+
+        for key, value in fault.items():
+            setattr(proxy, key, value)
+        fault_start = time.time()
+        await asyncio.sleep(fault_seconds)
+        proxy.heal()
+        heal = time.time()
+
+        recovered = None
+        while time.time() - heal < max_recovery:
+            if manager._cache_time >= heal:
+                recovered = manager._cache_time
+                break
+            await asyncio.sleep(0.05)
+        after = dict(manager.stats)
+        failovers = list(manager.failover_times)
+    finally:
+        stop.set()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await proxy.stop()
+        await device.stop()
+        await asyncio.to_thread(manager.set_device_factory, None)
+
+    return {
+        "scenario": name,
+        "fault_s": round(heal - fault_start, 2),
+        "recover_s": round(recovered - heal, 3) if recovered else None,
+        "stale_s": round(recovered - fresh_before_fault, 3) if recovered else None,
+        "wasted": (_requests(after) - _requests(before)) - (_oks(after) - _oks(before)),
+        "reconnects": after["reconnects"] - before["reconnects"],
+        "errors_914": after["errors_914"] - before["errors_914"],
+        "timeouts": after["timeouts"] - before["timeouts"],
+        "empty": empty,
+        "injected": proxy.injected,
+        "failover_ms": round(max(t for _, t in failovers) * 1000, 1) if failovers else None,
+        "failover_kinds": sorted({kind for kind, _ in failovers}),
+    }
+
+
+def print_table(results, out=sys.stdout):
+    columns = ["scenario", "fault_s", "recover_s", "stale_s", "wasted", "reconnects",
+               "errors_914", "timeouts", "empty", "injected", "failover_ms"]
+    print(" ".join(f"{c:>11}" for c in columns), file=out)
+    for result in results:
+        cells = ["—" if result[c] is None else str(result[c]) for c in columns]
+        print(" ".join(f"{c:>11}" for c in cells), file=out)
+
+
+async def main_async(args):
+    results = []
+    for name in args.scenarios:
+        result = await run_scenario(
+            name, SCENARIOS[name], args.warmup, args.fault_seconds, args.poll_interval, args.max_recovery,
+            args.hot_standby,
+        )
+        results.append(result)
+        print(f"{name}: done", file=sys.stderr)
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark manager recovery under injected faults")
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--warmup", type=float, default=2.0)
+    parser.add_argument("--fault-seconds", type=float, default=5.0)
+    parser.add_argument("--poll-interval", type=float, default=0.25)
+    parser.add_argument("--max-recovery", type=float, default=30.0)
+    parser.add_argument("--hot-standby", action="store_true", help="run the manager with a standby connection")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    parser.add_argument("-v", "--verbose", action="store_true")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.CRITICAL, stream=sys.stderr)
+    results = asyncio.run(main_async(args))
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_table(results)
+    return 0 if all(r["recover_s"] is not None for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
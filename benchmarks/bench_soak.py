@@ -0,0 +1,239 @@
+"""Soak Benchmark - v1.0 - Memory and resource growth over long runs
+
+    python -m klarta_humea.benchmarks.bench_soak
+    python -m klarta_humea.benchmarks.bench_soak --ops 2000000 --duration 0 --reconnect-every 500 --json
+
+The manager polls a local DeviceStandIn over real sockets (GatewayDevice),
+with the cache disabled, plus a write every --write-every polls and a
+forced reconnect (new device object, new socket) every --reconnect-every
+polls. Every --sample-every seconds one row is taken:
+
+    polls      status requests that reached the device so far
+    calls      get_status() calls (answers from the cache or an in-flight
+               fetch included - several per poll with --concurrency > 1)
+    rss_kb     resident set size (Linux /proc, else peak RSS)
+    traced_kb  Python heap seen by tracemalloc
+    fds        open file descriptors (Linux/macOS)
+    threads    live Python threads
+    managers   entries in PersistentDeviceManager._instances
+
+The baseline is taken after --warmup seconds (thread pool, caches and
+buffers have settled). The run fails when the median of the last three
+samples has grown past a threshold; the top tracemalloc allocators since
+the baseline are printed to show where the growth is.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import statistics
+import sys
+import threading
+import time
+import tracemalloc
+
+from ..device_manager_v5_7_FINAL import PersistentDeviceManager
+from ..gateway import GatewayDevice
+from .fault_proxy import DeviceStandIn
+
+SOAK_OPTIONS = {
+    "min_cache_interval": 0.0,
+    "cache_validity": 0.0,
+    "status_timeout": 5.0,
+    "set_timeout": 5.0,
+    "write_coalesce_window": 0.0,
+}
+
+SPEEDS = ["Low_speed", "Medium_speed", "High_speed"]
+
+
+def rss_kb() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+    except (OSError, ValueError):
+        import resource
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def open_fds() -> int:
+    for path in ("/proc/self/fd", "/dev/fd"):
+        try:
+            return len(os.listdir(path))
+        except OSError:
+            continue
+    return -1
+
+
+def _snapshot():
+    """tracemalloc snapshot without tracemalloc's own bookkeeping"""
+    return tracemalloc.take_snapshot().filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    ])
+
+
+def take_sample(started: float, calls: int, manager) -> dict:
+    return {
+        "t": round(time.monotonic() - started, 1),
+        "polls": manager.stats["status_requests"],
+        "calls": calls,
+        "writes": manager.stats["set_requests"],
+        "reconnects": manager.stats["reconnects"],
+        "rss_kb": rss_kb(),
+        "traced_kb": tracemalloc.get_traced_memory()[0] // 1024,
+        "fds": open_fds(),
+        "threads": threading.active_count(),
+        "managers": len(PersistentDeviceManager._instances),
+    }
+
+
+def growth(baseline: dict, samples: list) -> dict:
+    tail = samples[-3:]
+    return {key: statistics.median(s[key] for s in tail) - baseline[key]
+            for key in ("rss_kb", "traced_kb", "fds", "threads", "managers")}
+
+
+async def soak(args) -> dict:
+    device = DeviceStandIn()
+    await device.start()
+    manager = PersistentDeviceManager(f"soak-{time.monotonic_ns()}", "key", "127.0.0.1")
+    manager.set_device_factory(GatewayDevice.factory("127.0.0.1", device.port, timeout=5.0))
+    manager.apply_options(SOAK_OPTIONS)
+
+    tracemalloc.start(args.trace_frames)
+    started = time.monotonic()
+    calls = 0
+    stop = asyncio.Event()
+    samples = []
+    baseline = baseline_snapshot = None
+
+    def polls() -> int:
+        return manager.stats["status_requests"]
+
+    def done() -> bool:
+        return (args.ops and polls() >= args.ops) or (args.duration and time.monotonic() - started >= args.duration)
+
+    async def worker(index: int):
+        nonlocal calls
+        last_poll = 0
+        while not stop.is_set():
+            await manager.get_status()
+            calls += 1
+            # Writes and reconnects follow real device polls, not calls answered from the cache
+            poll = polls()
+            if poll != last_poll:
+                last_poll = poll
+                if args.write_every and poll % args.write_every == index:
+                    await manager.set_value("103", SPEEDS[poll % 3])
+                if args.reconnect_every and poll % args.reconnect_every == 0:
+                    await asyncio.to_thread(manager._reconnect_sync)
+            if done():
+                stop.set()
+            # Cached answers return without suspending - let the fetch and sampler run
+            await asyncio.sleep(0)
+
+    async def sampler():
+        nonlocal baseline, baseline_snapshot
+        await asyncio.sleep(args.warmup)
+        baseline = take_sample(started, calls, manager)
+        baseline_snapshot = _snapshot()
+        samples.append(baseline)
+        print(" ".join(f"{k:>10}" for k in baseline), file=sys.stderr)
+        print(" ".join(f"{v!s:>10}" for v in baseline.values()), file=sys.stderr)
+        while not stop.is_set():
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=args.sample_every)
+            except asyncio.TimeoutError:
+                pass
+            sample = take_sample(started, calls, manager)
+            samples.append(sample)
+            print(" ".join(f"{v!s:>10}" for v in sample.values()), file=sys.stderr)
+
+    try:
+        await asyncio.gather(sampler(), *(worker(i) for i in range(args.concurrency)))
+    finally:
+        stop.set()
+        await device.stop()
+
+    top = []
+    if baseline_snapshot is not None:
+        stats = _snapshot().compare_to(baseline_snapshot, "lineno")
+        top = [str(stat) for stat in stats[:args.top]]
+    tracemalloc.stop()
+    await asyncio.to_thread(manager.set_device_factory, None)
+
+    elapsed = time.monotonic() - started
+    return {
+        "elapsed_s": round(elapsed, 1),
+        "polls": polls(),
+        "polls_per_s": round(polls() / elapsed, 1),
+        "calls": calls,
+        "baseline": baseline,
+        "growth": growth(baseline, samples) if baseline else {},
+        "top_allocators": top,
+        "samples": samples,
+    }
+
+
+def check(result: dict, args) -> list:
+    limits = {
+        "rss_kb": args.max_rss_growth * 1024,
+        "traced_kb": args.max_traced_growth * 1024,
+        "fds": args.max_fd_growth,
+        "threads": args.max_thread_growth,
+        "managers": 0,
+    }
+    return [f"{key} grew by {result['growth'][key]} (limit {limit})"
+            for key, limit in limits.items() if result["growth"].get(key, 0) > limit]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Soak the device manager and watch resource growth")
+    parser.add_argument("--ops", type=int, default=0, help="stop after this many device polls (0 = no limit)")
+    parser.add_argument("--duration", type=float, default=60.0, help="stop after this many seconds (0 = no limit)")
+    parser.add_argument("--concurrency", type=int, default=2)
+    parser.add_argument("--write-every", type=int, default=50)
+    parser.add_argument("--reconnect-every", type=int, default=1000)
+    parser.add_argument("--warmup", type=float, default=5.0)
+    parser.add_argument("--sample-every", type=float, default=5.0)
+    parser.add_argument("--trace-frames", type=int, default=1, help="tracemalloc frames per allocation")
+    parser.add_argument("--top", type=int, default=10, help="allocators to list")
+    parser.add_argument("--max-rss-growth", type=float, default=20.0, help="MB")
+    parser.add_argument("--max-traced-growth", type=float, default=5.0, help="MB")
+    parser.add_argument("--max-fd-growth", type=int, default=4)
+    parser.add_argument("--max-thread-growth", type=int, default=2)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    parser.add_argument("-v", "--verbose", action="store_true")
+    args = parser.parse_args(argv)
+    if not args.ops and not args.duration:
+        parser.error("need --ops or --duration")
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.CRITICAL, stream=sys.stderr)
+    result = asyncio.run(soak(args))
+    if not result["baseline"]:
+        print("run ended before the warmup - nothing measured", file=sys.stderr)
+        return 1
+    failures = check(result, args)
+    result["failures"] = failures
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print(f"\n{result['polls']} device polls in {result['elapsed_s']}s ({result['polls_per_s']}/s, "
+              f"{result['calls']} get_status() calls)")
+        print(f"growth since baseline: {result['growth']}")
+        print("top allocators since baseline:")
+        for line in result["top_allocators"]:
+            print(f"  {line}")
+        for failure in failures:
+            print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
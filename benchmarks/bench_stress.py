@@ -0,0 +1,330 @@
+"""Stress Harness - v1.0 - Manager invariants and throughput under contention
+
+    python -m klarta_humea.benchmarks.bench_stress
+    python -m klarta_humea.benchmarks.bench_stress --tasks 32 --threads 4 --duration 20 --poison-every 2
+
+Many asyncio tasks on the main loop plus worker threads, each with its own
+event loop, share one manager and hammer get_status()/set_value() against
+an in-process device. Every few seconds all open connections are poisoned
+(requests on them fail, new connections work) so reconnects race too.
+
+Each worker owns one DP and writes increasing values to it; all workers
+also fight over one shared DP. Every loop also runs a slider: it fires
+increasing writes to its own DP without waiting for the previous one, the
+way a dragged slider does. Checked invariants:
+
+    lost writes         an acknowledged write is not the device's final value
+                        (for a slider: the last value fired)
+    reordered writes    a slider's values reached the device out of order
+    stale after write   get_status() right after an acknowledged write shows an older value
+    duplicate reconnect a healthy connection was replaced
+    escaped errors      get_status()/set_value() raised instead of returning
+    hung calls          a call did not return within --call-timeout
+
+Exits 1 when any invariant is violated.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import sys
+import threading
+import time
+from collections import defaultdict
+
+from ..device_manager_v5_7_FINAL import PersistentDeviceManager
+
+SHARED_DP = "103"
+FIRST_WORKER_DP = 200
+
+STRESS_OPTIONS = {
+    "min_cache_interval": 0.0,
+    "cache_validity": 0.05,
+    "status_timeout": 2.0,
+    "set_timeout": 2.0,
+    "write_coalesce_window": 0.005,
+}
+
+
+class StressDevice:
+    """The physical unit - one DP state shared by every connection"""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.dps = {"1": True, "10": 21, "14": 48, "16": False, "101": "55RH",
+                    "102": "Water_enough", SHARED_DP: "w0-0"}
+        self.lock = threading.Lock()
+        self.current = None
+        self.connections = 0
+        self.duplicate_reconnects = 0
+        # Values in arrival order for the slider DPs
+        self.history = {}
+
+    def add_dps(self, dps):
+        with self.lock:
+            for dp in dps:
+                self.dps.setdefault(dp, 0)
+
+    def track(self, dps):
+        with self.lock:
+            for dp in dps:
+                self.dps.setdefault(dp, 0)
+                self.history[dp] = []
+
+    def factory(self):
+        with self.lock:
+            previous = self.current
+            if previous is not None and not previous.poisoned and not previous.closed:
+                self.duplicate_reconnects += 1
+            self.current = StressConnection(self)
+            self.connections += 1
+            return self.current
+
+    def poison(self):
+        with self.lock:
+            if self.current is not None:
+                self.current.poisoned = True
+
+
+class StressConnection:
+    """One tinytuya-like connection - fails every request once poisoned"""
+
+    def __init__(self, device: StressDevice):
+        self._device = device
+        self.poisoned = False
+        self.closed = False
+
+    def _call(self):
+        if self.latency:
+            time.sleep(self.latency)
+        if self.poisoned or self.closed:
+            raise ConnectionError("connection poisoned")
+
+    @property
+    def latency(self):
+        return self._device.latency
+
+    def status(self):
+        self._call()
+        with self._device.lock:
+            return {"dps": dict(self._device.dps)}
+
+    def set_value(self, dp, value):
+        self._call()
+        with self._device.lock:
+            self._device.dps[str(dp)] = value
+            if str(dp) in self._device.history:
+                self._device.history[str(dp)].append(value)
+            return {"dps": {str(dp): value}}
+
+    def heartbeat(self):
+        self._call()
+        return {}
+
+    def close(self):
+        self.closed = True
+
+    def set_socketPersistent(self, persist):
+        pass
+
+    def set_socketNODELAY(self, nodelay):
+        pass
+
+    def set_socketTimeout(self, timeout):
+        pass
+
+
+class Results:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.acked = {}
+        self.slid = {}
+        self.stale = []
+        self.errors = []
+        self.hung = 0
+        self.empty = 0
+
+    def add(self, op: str, latency: float):
+        with self.lock:
+            self.latencies[op].append(latency)
+
+
+async def worker(manager, dp: str, name: str, results: Results, deadline: float, write_ratio: float, seed: int,
+                 call_timeout: float):
+    rng = random.Random(seed)
+    counter = 0
+    while time.monotonic() < deadline:
+        try:
+            if rng.random() < write_ratio:
+                counter += 1
+                shared = rng.random() < 0.3
+                target, value = (SHARED_DP, f"{name}-{counter}") if shared else (dp, counter)
+                started = time.monotonic()
+                ok = await asyncio.wait_for(manager.set_value(target, value), call_timeout)
+                results.add("set", time.monotonic() - started)
+                if not ok or shared:
+                    continue
+                results.acked[dp] = value
+                data = await asyncio.wait_for(manager.get_status(), call_timeout)
+                if data and data.get("dps") and data["dps"].get(dp) != value:
+                    with results.lock:
+                        results.stale.append((dp, value, data["dps"].get(dp)))
+            else:
+                started = time.monotonic()
+                data = await asyncio.wait_for(manager.get_status(), call_timeout)
+                results.add("status", time.monotonic() - started)
+                if not data:
+                    with results.lock:
+                        results.empty += 1
+        except asyncio.TimeoutError:
+            with results.lock:
+                results.hung += 1
+        except Exception as e:
+            with results.lock:
+                results.errors.append(f"{type(e).__name__}: {e}")
+        await asyncio.sleep(0)
+
+
+async def slider(manager, dp: str, results: Results, deadline: float, interval: float, call_timeout: float):
+    """Writes to one DP without waiting for the previous write, like a dragged slider"""
+    value = 0
+    writes = []
+    while time.monotonic() < deadline:
+        value += 1
+        writes.append(asyncio.ensure_future(asyncio.wait_for(manager.set_value(dp, value), call_timeout)))
+        await asyncio.sleep(interval)
+    outcomes = await asyncio.gather(*writes, return_exceptions=True)
+    with results.lock:
+        for outcome in outcomes:
+            if isinstance(outcome, asyncio.TimeoutError):
+                results.hung += 1
+            elif isinstance(outcome, BaseException):
+                results.errors.append(f"{type(outcome).__name__}: {outcome}")
+        if outcomes and outcomes[-1] is True:
+            results.slid[dp] = value
+
+
+def thread_main(manager, dps, slider_dp, results, deadline, write_ratio, index, call_timeout, slide_interval):
+    async def run():
+        await asyncio.gather(
+            slider(manager, slider_dp, results, deadline, slide_interval, call_timeout),
+            *(worker(manager, dp, f"t{index}.{i}", results, deadline, write_ratio, index * 1000 + i, call_timeout)
+              for i, dp in enumerate(dps)),
+        )
+
+    asyncio.run(run())
+
+
+async def poisoner(device: StressDevice, every: float, deadline: float):
+    if every <= 0:
+        return
+    while time.monotonic() + every < deadline:
+        await asyncio.sleep(every)
+        device.poison()
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))] if values else 0.0
+
+
+async def main_async(args) -> dict:
+    device = StressDevice(args.latency)
+    manager = PersistentDeviceManager(f"stress-{time.monotonic_ns()}", "key", "127.0.0.1")
+    manager.set_device_factory(device.factory)
+    manager.apply_options(STRESS_OPTIONS)
+
+    total = args.tasks + args.threads * args.thread_tasks
+    dps = [str(FIRST_WORKER_DP + i) for i in range(total)]
+    device.add_dps(dps)
+    slider_dps = [str(FIRST_WORKER_DP + total + i) for i in range(args.threads + 1)]
+    device.track(slider_dps)
+    loop_dps, thread_dps = dps[:args.tasks], dps[args.tasks:]
+    results = Results()
+
+    started = time.monotonic()
+    deadline = started + args.duration
+    threads = [
+        threading.Thread(
+            target=thread_main, daemon=True,
+            args=(manager, thread_dps[i * args.thread_tasks:(i + 1) * args.thread_tasks], slider_dps[i + 1],
+                  results, deadline, args.write_ratio, i + 1, args.call_timeout, args.slide_interval),
+        )
+        for i in range(args.threads)
+    ]
+    for thread in threads:
+        thread.start()
+    await asyncio.gather(
+        poisoner(device, args.poison_every, deadline),
+        slider(manager, slider_dps[0], results, deadline, args.slide_interval, args.call_timeout),
+        *(worker(manager, dp, f"m.{i}", results, deadline, args.write_ratio, i, args.call_timeout)
+          for i, dp in enumerate(loop_dps)),
+    )
+    for thread in threads:
+        await asyncio.to_thread(thread.join, args.call_timeout + 1)
+    elapsed = time.monotonic() - started
+
+    # Let in-flight coalesced writes land, then compare with the device
+    await asyncio.sleep(0.2)
+    acked = {**results.acked, **results.slid}
+    lost = [(dp, value, device.dps.get(dp)) for dp, value in acked.items() if device.dps.get(dp) != value]
+    reordered = [(dp, history) for dp, history in device.history.items()
+                 if any(a >= b for a, b in zip(history, history[1:]))]
+
+    calls = {op: len(v) for op, v in results.latencies.items()}
+    return {
+        "elapsed_s": round(elapsed, 2),
+        "ops_per_s": round(sum(calls.values()) / elapsed, 1),
+        "calls": calls,
+        "p50_ms": {op: round(percentile(v, 50) * 1000, 2) for op, v in results.latencies.items()},
+        "p99_ms": {op: round(percentile(v, 99) * 1000, 2) for op, v in results.latencies.items()},
+        "connections": device.connections,
+        "reconnects": manager.stats["reconnects"],
+        "empty_reads": results.empty,
+        "lost_writes": len(lost),
+        "reordered_writes": len(reordered),
+        "slider_writes": {dp: len(history) for dp, history in device.history.items()},
+        "stale_after_write": len(results.stale),
+        "duplicate_reconnects": device.duplicate_reconnects,
+        "escaped_errors": len(results.errors),
+        "hung_calls": results.hung,
+        "examples": {
+            "lost": lost[:3],
+            "reordered": [(dp, history[:20]) for dp, history in reordered[:2]],
+            "stale": results.stale[:3],
+            "errors": sorted(set(results.errors))[:5],
+        },
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Stress the device manager from many tasks and threads")
+    parser.add_argument("--tasks", type=int, default=16, help="worker tasks on the main loop")
+    parser.add_argument("--threads", type=int, default=4, help="worker threads, each with its own loop")
+    parser.add_argument("--thread-tasks", type=int, default=4, help="worker tasks per thread")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--write-ratio", type=float, default=0.3)
+    parser.add_argument("--latency", type=float, default=0.002, help="device response time (s)")
+    parser.add_argument("--slide-interval", type=float, default=0.003, help="seconds between slider writes")
+    parser.add_argument("--poison-every", type=float, default=2.0, help="poison connections every N s (0 = never)")
+    parser.add_argument("--call-timeout", type=float, default=10.0, help="a call taking longer counts as hung")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    parser.add_argument("-v", "--verbose", action="store_true")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.CRITICAL, stream=sys.stderr)
+    result = asyncio.run(main_async(args))
+    if args.json:
+        print(json.dumps(result, indent=2, default=str))
+    else:
+        for key, value in result.items():
+            print(f"{key:<22} {value}")
+    violations = ("lost_writes", "reordered_writes", "stale_after_write", "duplicate_reconnects", "escaped_errors", "hung_calls")
+    return 1 if any(result[k] for k in violations) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,174 @@
+"""Fault Proxy - v1.0 - Device stand-in and fault-injecting TCP proxy
+
+    manager -> GatewayDevice -> FaultProxy -> DeviceStandIn
+
+DeviceStandIn speaks the gateway JSON-lines protocol (see gateway.py) and
+holds a DP state like a Klarta unit. FaultProxy sits in between and can be
+switched at runtime to inject:
+
+    latency    extra delay per forwarded line (both directions)
+    drop       probability that a device reply is swallowed
+    half_open  forward nothing, keep both sockets open
+    rst        reset client connections (SO_LINGER 0) on their next request
+    force_914  answer every request with a 914 instead of forwarding
+"""
+
+import asyncio
+import json
+import logging
+import random
+import socket
+import struct
+from typing import Optional
+
+_LOGGER = logging.getLogger(__name__)
+
+KLARTA_DPS = {
+    "1": True,
+    "10": 21,
+    "14": 48,
+    "16": False,
+    "101": "55RH",
+    "102": "Water_enough",
+    "103": "Low_speed",
+}
+
+
+class DeviceStandIn:
+    """Local TCP device speaking the gateway protocol"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, dps: Optional[dict] = None):
+        self.host = host
+        self.port = port
+        self.dps = dict(dps or KLARTA_DPS)
+        self.requests = 0
+        self._server = None
+        self._tasks = set()
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        if self._server is None:
+            return
+        self._server.close()
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        await self._server.wait_closed()
+        self._server = None
+
+    async def _handle(self, reader, writer):
+        self._tasks.add(asyncio.current_task())
+        try:
+            while line := await reader.readline():
+                request = json.loads(line)
+                self.requests += 1
+                reply = {"id": request.get("id"), "ok": True}
+                if request.get("op") == "status":
+                    # Humidity drifts like the real sensor
+                    self.dps["14"] = 45 + (self.requests % 7)
+                    reply["dps"] = dict(self.dps)
+                elif request.get("op") == "set":
+                    self.dps[str(request["dp"])] = request["value"]
+                writer.write(json.dumps(reply).encode() + b"\n")
+                await writer.drain()
+        except (ConnectionError, asyncio.CancelledError, ValueError):
+            pass
+        finally:
+            self._tasks.discard(asyncio.current_task())
+            writer.close()
+
+
+class FaultProxy:
+    """Line-aware TCP proxy with switchable faults"""
+
+    def __init__(self, target_host: str, target_port: int, host: str = "127.0.0.1", port: int = 0):
+        self.target = (target_host, target_port)
+        self.host = host
+        self.port = port
+        self.latency = 0.0
+        self.drop = 0.0
+        self.half_open = False
+        self.rst = False
+        self.force_914 = False
+        self.forwarded = 0
+        self.injected = 0
+        self._server = None
+        self._tasks = set()
+        self._random = random.Random(1234)
+
+    def heal(self):
+        self.latency = 0.0
+        self.drop = 0.0
+        self.half_open = False
+        self.rst = False
+        self.force_914 = False
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        if self._server is None:
+            return
+        self._server.close()
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        await self._server.wait_closed()
+        self._server = None
+
+    @staticmethod
+    def _reset(writer):
+        sock = writer.get_extra_info("socket")
+        if sock is not None:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0))
+        writer.transport.abort()
+
+    async def _handle(self, client_reader, client_writer):
+        self._tasks.add(asyncio.current_task())
+        device_writer = None
+        try:
+            device_reader, device_writer = await asyncio.open_connection(*self.target)
+            while line := await client_reader.readline():
+                if self.rst:
+                    self.injected += 1
+                    self._reset(client_writer)
+                    return
+                if self.half_open:
+                    # Swallow the request, never answer, keep the socket open
+                    self.injected += 1
+                    continue
+                if self.force_914:
+                    self.injected += 1
+                    request = json.loads(line)
+                    reply = {"id": request.get("id"), "ok": False, "err": "914"}
+                    client_writer.write(json.dumps(reply).encode() + b"\n")
+                    await client_writer.drain()
+                    continue
+
+                if self.latency:
+                    await asyncio.sleep(self.latency)
+                device_writer.write(line)
+                await device_writer.drain()
+                reply = await device_reader.readline()
+                if not reply:
+                    break
+                if self.drop and self._random.random() < self.drop:
+                    self.injected += 1
+                    continue
+                if self.latency:
+                    await asyncio.sleep(self.latency)
+                self.forwarded += 1
+                client_writer.write(reply)
+                await client_writer.drain()
+        except (ConnectionError, asyncio.CancelledError, ValueError):
+            pass
+        finally:
+            self._tasks.discard(asyncio.current_task())
+            if device_writer is not None:
+                device_writer.close()
+            if not client_writer.transport.is_closing():
+                client_writer.close()
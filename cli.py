@@ -0,0 +1,222 @@
+"""Standalone CLI - v1.0 - Poll, script and load-test devices without Home Assistant
+
+    python -m klarta_humea poll devices.json --interval 5 --count 100
+    python -m klarta_humea poll devices.json --no-cache --interval 0 --duration 60
+    python -m klarta_humea script devices.json steps.jsonl --repeat 10
+
+devices.json is a list of config-entry-like dicts:
+    [{"name": "Bedroom", "device_id": "...", "local_key": "...",
+      "ip_address": "192.168.1.20", "protocol_version": "3.4"}]
+An optional "replay" key (trace path) plays a recorded trace instead.
+
+steps.jsonl holds one step per line:
+    {"device": "Bedroom", "dp": "101", "value": "55RH"}
+    {"sleep": 2.0}
+
+Snapshots / results stream to stdout as JSON lines, the summary goes to stderr.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+from collections import Counter, defaultdict
+
+from .device_manager_v5_7_FINAL import PersistentDeviceManager
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def percentile(sorted_values, pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+class RunStats:
+    """Latency and outcome bookkeeping per (device, op)"""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.outcomes = defaultdict(Counter)
+        self.started = time.monotonic()
+
+    def add(self, device: str, op: str, latency: float, outcome: str):
+        self.latencies[(device, op)].append(latency)
+        self.outcomes[(device, op)][outcome] += 1
+
+    def report(self, managers: dict, out=sys.stderr):
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        total = sum(len(v) for v in self.latencies.values())
+        print(f"\n=== {total} calls in {elapsed:.1f}s ({total / elapsed:.1f}/s) ===", file=out)
+        print(f"{'device':<20} {'op':<7} {'calls':>7} {'ok':>7} {'ops/s':>8} "
+              f"{'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'max ms':>8}", file=out)
+        for (device, op), values in sorted(self.latencies.items()):
+            values = sorted(values)
+            ok = self.outcomes[(device, op)]["ok"]
+            print(f"{device:<20} {op:<7} {len(values):>7} {ok:>7} {len(values) / elapsed:>8.1f} "
+                  f"{percentile(values, 50) * 1000:>8.1f} {percentile(values, 90) * 1000:>8.1f} "
+                  f"{percentile(values, 99) * 1000:>8.1f} {values[-1] * 1000:>8.1f}", file=out)
+
+        print("\n--- errors ---", file=out)
+        for (device, op), outcomes in sorted(self.outcomes.items()):
+            errors = {k: v for k, v in outcomes.items() if k != "ok"}
+            if errors:
+                print(f"{device:<20} {op:<7} {dict(errors)}", file=out)
+        for name, manager in managers.items():
+            counters = {k: v for k, v in manager.stats.items() if v}
+            print(f"{name:<20} manager {counters}", file=out)
+
+
+def load_devices(path: str, replay_speed: float, no_cache: bool) -> dict:
+    with open(path, encoding="utf-8") as f:
+        entries = json.load(f)
+
+    managers = {}
+    for entry in entries:
+        name = entry.get("name", entry["device_id"])
+        manager = PersistentDeviceManager(
+            entry["device_id"],
+            entry["local_key"],
+            entry.get("ip_address"),
+            entry.get("protocol_version", "3.4"),
+        )
+        if entry.get("replay"):
+            from .traffic_recorder import ReplayDevice
+
+            manager.set_device_factory(ReplayDevice.factory(entry["replay"], speed=replay_speed))
+        manager.apply_options(entry.get("options", {}))
+        if no_cache:
+            manager.apply_options({"min_cache_interval": 0, "cache_validity": 0})
+        managers[name] = manager
+    return managers
+
+
+def emit(record: dict):
+    sys.stdout.write(json.dumps(record, separators=(",", ":"), default=str) + "\n")
+
+
+async def _timed(stats: RunStats, device: str, op: str, coro, timeout: float):
+    started = time.monotonic()
+    try:
+        result = await asyncio.wait_for(coro, timeout=timeout)
+        outcome = "ok" if result else ("empty" if op == "status" else "failed")
+    except asyncio.TimeoutError:
+        result, outcome = None, "timeout"
+    except Exception as e:
+        result, outcome = None, type(e).__name__
+    latency = time.monotonic() - started
+    stats.add(device, op, latency, outcome)
+    return result, outcome, latency
+
+
+async def poll_device(name: str, manager, stats: RunStats, args, deadline: float):
+    polls = 0
+    while (not args.count or polls < args.count) and time.monotonic() < deadline:
+        data, outcome, latency = await _timed(stats, name, "status", manager.get_status(), args.timeout)
+        polls += 1
+        if not args.quiet:
+            age = manager.cache_age
+            emit({
+                "ts": round(time.time(), 3),
+                "device": name,
+                "outcome": outcome,
+                "latency_ms": round(latency * 1000, 2),
+                "age": None if age is None else round(age, 3),
+                "dps": (data or {}).get("dps", {}),
+            })
+        if args.interval:
+            await asyncio.sleep(args.interval)
+
+
+async def run_poll(args) -> int:
+    managers = load_devices(args.devices, args.replay_speed, args.no_cache)
+    stats = RunStats()
+    deadline = time.monotonic() + args.duration if args.duration else float("inf")
+    if not args.count and not args.duration:
+        args.count = 1
+
+    tasks = [
+        poll_device(name, manager, stats, args, deadline)
+        for name, manager in managers.items()
+        for _ in range(args.concurrency)
+    ]
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        stats.report(managers)
+    return 0
+
+
+async def run_script(args) -> int:
+    managers = load_devices(args.devices, args.replay_speed, False)
+    with open(args.script, encoding="utf-8") as f:
+        steps = [json.loads(line) for line in f if line.strip()]
+
+    stats = RunStats()
+    failures = 0
+    try:
+        for _ in range(args.repeat):
+            for step in steps:
+                if "sleep" in step:
+                    await asyncio.sleep(float(step["sleep"]))
+                    continue
+                name = step["device"]
+                if name not in managers:
+                    _LOGGER.error(f"❌ Unknown device in script: {name}")
+                    return 2
+                _, outcome, latency = await _timed(
+                    stats, name, "set", managers[name].set_value(str(step["dp"]), step["value"]), args.timeout
+                )
+                failures += outcome != "ok"
+                if not args.quiet:
+                    emit({
+                        "ts": round(time.time(), 3),
+                        "device": name,
+                        "dp": step["dp"],
+                        "value": step["value"],
+                        "outcome": outcome,
+                        "latency_ms": round(latency * 1000, 2),
+                    })
+    finally:
+        stats.report(managers)
+    return 1 if failures else 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="klarta_humea", description=__doc__.splitlines()[0])
+    parser.add_argument("-v", "--verbose", action="count", default=0, help="-v info, -vv debug logging")
+    parser.add_argument("-q", "--quiet", action="store_true", help="only print the summary")
+    parser.add_argument("--timeout", type=float, default=30.0, help="per-call timeout (s)")
+    parser.add_argument("--replay-speed", type=float, default=1.0, help="speed for devices with a replay trace")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    poll = sub.add_parser("poll", help="poll devices and stream snapshots")
+    poll.add_argument("devices")
+    poll.add_argument("--interval", type=float, default=5.0, help="seconds between polls per task")
+    poll.add_argument("--count", type=int, default=0, help="polls per task (0 = until --duration)")
+    poll.add_argument("--duration", type=float, default=0.0, help="stop after this many seconds")
+    poll.add_argument("--concurrency", type=int, default=1, help="concurrent polling tasks per device")
+    poll.add_argument("--no-cache", action="store_true", help="hit the device on every poll")
+    poll.set_defaults(func=run_poll)
+
+    script = sub.add_parser("script", help="run set_value steps from a JSON-lines file")
+    script.add_argument("devices")
+    script.add_argument("script")
+    script.add_argument("--repeat", type=int, default=1)
+    script.set_defaults(func=run_script)
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    level = (logging.WARNING, logging.INFO, logging.DEBUG)[min(args.verbose, 2)]
+    logging.basicConfig(level=level, stream=sys.stderr, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    try:
+        return asyncio.run(args.func(args))
+    except KeyboardInterrupt:
+        return 130
@@ -8,10 +8,54 @@ from homeassistant import config_entries
 from homeassistant.core import callback
 from homeassistant.helpers import config_validation as cv
 
+from .const import (
+    DEFAULT_AVAILABILITY_FAILURES,
+    DEFAULT_AVAILABILITY_GRACE,
+    DEFAULT_CACHE_VALIDITY,
+    DEFAULT_GATEWAY_HOST,
+    DEFAULT_GATEWAY_PORT,
+    DEFAULT_ENTITY_TIMEOUT,
+    DEFAULT_FULL_REFRESH_INTERVAL,
+    DEFAULT_HUMIDITY_DEADBAND,
+    DEFAULT_MAX_REPORT_AGE,
+    DEFAULT_MAX_STALENESS,
+    DEFAULT_MIN_CACHE_INTERVAL,
+    DEFAULT_MIN_REPORT_INTERVAL,
+    DEFAULT_RATE_BURST,
+    DEFAULT_RATE_LIMIT,
+    DEFAULT_SET_TIMEOUT,
+    DEFAULT_STATUS_TIMEOUT,
+    DEFAULT_TELEMETRY_DIR,
+    DEFAULT_TEMPERATURE_DEADBAND,
+    DEFAULT_WRITE_COALESCE_WINDOW,
+    SOCKET_NODELAY,
+    SOCKET_TIMEOUT,
+)
+
 _LOGGER = logging.getLogger(__name__)
 
 DOMAIN = "klarta_humea"
 
+# option key -> (default, min, max)
+PERFORMANCE_OPTIONS = {
+    "min_cache_interval": (DEFAULT_MIN_CACHE_INTERVAL, 1.0, 300.0),
+    "cache_validity": (DEFAULT_CACHE_VALIDITY, 1.0, 600.0),
+    "status_timeout": (DEFAULT_STATUS_TIMEOUT, 1.0, 60.0),
+    "set_timeout": (DEFAULT_SET_TIMEOUT, 1.0, 60.0),
+    "entity_timeout": (DEFAULT_ENTITY_TIMEOUT, 1.0, 60.0),
+    "socket_timeout": (SOCKET_TIMEOUT, 1.0, 30.0),
+    "availability_grace": (DEFAULT_AVAILABILITY_GRACE, 0.0, 3600.0),
+    "full_refresh_interval": (DEFAULT_FULL_REFRESH_INTERVAL, 30.0, 3600.0),
+    "max_staleness": (DEFAULT_MAX_STALENESS, 5.0, 3600.0),
+    "write_coalesce_window": (DEFAULT_WRITE_COALESCE_WINDOW, 0.0, 5.0),
+    "rate_limit": (DEFAULT_RATE_LIMIT, 0.0, 50.0),
+    "rate_burst": (DEFAULT_RATE_BURST, 1.0, 50.0),
+    "humidity_deadband": (DEFAULT_HUMIDITY_DEADBAND, 0.0, 20.0),
+    "temperature_deadband": (DEFAULT_TEMPERATURE_DEADBAND, 0.0, 10.0),
+    "min_report_interval": (DEFAULT_MIN_REPORT_INTERVAL, 0.0, 3600.0),
+    "max_report_age": (DEFAULT_MAX_REPORT_AGE, 0.0, 86400.0),
+}
+
 
 class KlartaConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Handle config flow for Klarta Humea."""
@@ -59,5 +103,59 @@ class KlartaOptionsFlow(config_entries.OptionsFlow):
         self.config_entry = config_entry
 
     async def async_step_init(self, user_input=None):
-        """Initialize options flow."""
-        return self.async_show_form(step_id="init")
+        """Performance tunables - applied live to the running manager."""
+        errors = {}
+
+        if user_input is not None:
+            if user_input["cache_validity"] < user_input["min_cache_interval"]:
+                errors["cache_validity"] = "cache_validity_below_min_interval"
+            elif user_input["max_staleness"] < user_input["cache_validity"]:
+                errors["max_staleness"] = "max_staleness_below_cache_validity"
+            elif user_input["max_report_age"] and user_input["max_report_age"] < user_input["min_report_interval"]:
+                errors["max_report_age"] = "max_age_below_min_interval"
+            else:
+                _LOGGER.info(f"Updating options for {self.config_entry.title}")
+                return self.async_create_entry(title="", data=user_input)
+
+        options = user_input or self.config_entry.options
+        schema = {}
+        for key, (default, minimum, maximum) in PERFORMANCE_OPTIONS.items():
+            schema[vol.Required(key, default=options.get(key, default))] = vol.All(
+                vol.Coerce(float), vol.Range(min=minimum, max=maximum)
+            )
+        schema[vol.Required(
+            "availability_failure_threshold",
+            default=options.get("availability_failure_threshold", DEFAULT_AVAILABILITY_FAILURES),
+        )] = vol.All(vol.Coerce(int), vol.Range(min=1, max=20))
+        schema[vol.Required(
+            "socket_nodelay", default=options.get("socket_nodelay", SOCKET_NODELAY)
+        )] = cv.boolean
+        schema[vol.Required(
+            "pipelining", default=options.get("pipelining", False)
+        )] = cv.boolean
+        schema[vol.Required(
+            "selective_refresh", default=options.get("selective_refresh", False)
+        )] = cv.boolean
+        schema[vol.Required(
+            "stale_while_revalidate", default=options.get("stale_while_revalidate", False)
+        )] = cv.boolean
+        schema[vol.Required(
+            "hot_standby", default=options.get("hot_standby", False)
+        )] = cv.boolean
+        schema[vol.Required(
+            "gateway_enabled", default=options.get("gateway_enabled", False)
+        )] = cv.boolean
+        schema[vol.Required(
+            "gateway_host", default=options.get("gateway_host", DEFAULT_GATEWAY_HOST)
+        )] = cv.string
+        schema[vol.Required(
+            "gateway_port", default=options.get("gateway_port", DEFAULT_GATEWAY_PORT)
+        )] = cv.port
+        schema[vol.Required(
+            "telemetry_enabled", default=options.get("telemetry_enabled", False)
+        )] = cv.boolean
+        schema[vol.Required(
+            "telemetry_dir", default=options.get("telemetry_dir", DEFAULT_TELEMETRY_DIR)
+        )] = cv.string
+
+        return self.async_show_form(step_id="init", data_schema=vol.Schema(schema), errors=errors)
@@ -17,15 +17,41 @@ DP_FAN_MODE = "103"
 MIN_TARGET_HUMIDITY = 40
 MAX_TARGET_HUMIDITY = 75
 
+# Sensor Reporting Filters (deadband, min interval s, max age s)
+DEFAULT_HUMIDITY_DEADBAND = 2.0         # %
+DEFAULT_TEMPERATURE_DEADBAND = 0.5      # °C
+DEFAULT_MIN_REPORT_INTERVAL = 60        # Hold changes for at least this long
+DEFAULT_MAX_REPORT_AGE = 600            # Publish the current value after this long regardless
+
 # Connection Throttle (seconds)
-MIN_UPDATE_INTERVAL = 45
 KEEP_ALIVE_INTERVAL = 30
 
+# Performance Tunables (options flow defaults)
+DEFAULT_MIN_CACHE_INTERVAL = 5.0   # Never poll the device more often than this
+DEFAULT_CACHE_VALIDITY = 10.0      # Serve cached status while younger than this
+DEFAULT_STATUS_TIMEOUT = 10.0      # Manager timeout for status()
+DEFAULT_SET_TIMEOUT = 10.0         # Manager timeout for set_value()
+DEFAULT_ENTITY_TIMEOUT = 5.0       # Entity-level wait_for timeout
+DEFAULT_WRITE_COALESCE_WINDOW = 0.2  # Same-DP writes within this collapse into one
+DEFAULT_FULL_REFRESH_INTERVAL = 300.0  # Full status at least this often with selective refresh
+DEFAULT_MAX_STALENESS = 120.0      # Stale-while-revalidate blocks once data is older than this
+DEFAULT_RATE_LIMIT = 0.0           # Outbound frames per second, 0 = unlimited
+DEFAULT_RATE_BURST = 3.0           # Frames sent back-to-back before shaping starts
+DEFAULT_AVAILABILITY_GRACE = 60.0
+DEFAULT_AVAILABILITY_FAILURES = 3
+
+# Local Gateway (one device session shared by several consumers)
+DEFAULT_GATEWAY_HOST = "127.0.0.1"
+DEFAULT_GATEWAY_PORT = 6680
+
+# Telemetry Export (relative to the Home Assistant config directory)
+DEFAULT_TELEMETRY_DIR = "klarta_telemetry"
+
 # Error Recovery
 ERROR_914_THRESHOLD = 2  # Recreate device after 2 Error 914s
 TIMEOUT_THRESHOLD = 3    # Recreate device after 3 consecutive timeouts
 
-# Socket Settings
+# Socket Settings (SOCKET_TIMEOUT/SOCKET_NODELAY are options flow defaults)
 SOCKET_TIMEOUT = 5.0  # seconds
 SOCKET_RETRIES = 2
 SOCKET_PERSISTENT = True
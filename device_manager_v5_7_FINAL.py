@@ -4,10 +4,25 @@ import logging
 import asyncio
 import threading
 import time
-from typing import Optional, Dict
+from collections import deque
+from typing import AsyncIterator, Iterable, Optional, Dict
+
+from .const import (
+    DEFAULT_AVAILABILITY_FAILURES,
+    DEFAULT_AVAILABILITY_GRACE,
+    DEFAULT_FULL_REFRESH_INTERVAL,
+    DEFAULT_MAX_STALENESS,
+    DEFAULT_RATE_BURST,
+    DEFAULT_RATE_LIMIT,
+    DEFAULT_WRITE_COALESCE_WINDOW,
+    KEEP_ALIVE_INTERVAL,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
+# DPs that change on their own: temperature, current humidity, water level
+VOLATILE_DPS = [10, 14, 102]
+
 class PersistentDeviceManager:
     """Singleton - v5.10 - Handle dual response formats from device"""
 
@@ -37,10 +52,21 @@ class PersistentDeviceManager:
         self._device = None
         self._device_lock = threading.Lock()
         self._device_initialized = False
-        self._init_lock = asyncio.Lock()
+        # Worker threads and any number of event loops share this manager, so
+        # only thread locks: connect/reconnect under _connect_lock, counters,
+        # cache and availability under _state_lock
+        self._connect_lock = threading.Lock()
+        self._state_lock = threading.RLock()
+        self._generation = 0
+        # Connect backoff after failures: 1 s, doubling up to 10 s
+        self._last_connect_failure = 0.0
+        self._connect_retry_interval = 0.0
         
         self._cached_status = {}
         self._cache_time = 0
+        # Set by an acknowledged write: the cache holds the overlaid value and
+        # must be refreshed, but _cache_time stays the real fetch time
+        self._cache_invalidated = False
         self._min_cache_interval = 5
         self._cache_validity = 10
         self._fetching = False
@@ -50,9 +76,78 @@ class PersistentDeviceManager:
         self._consecutive_failures = 0
         self._last_keep_alive = 0
         self._last_complete_response = None
+        # Latest acknowledged write per DP as (write seq, value) - overlaid on
+        # status responses that were requested before the write landed
+        self._write_seq = 0
+        self._recent_writes = {}
         
         self._status_timeout = 10.0
         self._set_timeout = 10.0
+        self._socket_timeout = 5.0
+        self._socket_nodelay = False
+        self._device_options_stale = False
+        self.entity_timeout = 5.0
+        
+        # Counters for benchmarks and the standalone CLI (never reset)
+        self.stats = dict.fromkeys((
+            "status_requests", "status_ok", "set_requests", "set_ok", "errors_914",
+            "timeouts", "exceptions", "invalid", "partial", "reconnects", "selective_requests",
+            "writes_superseded", "failovers", "standby_builds", "throttled", "throttled_ms",
+            "watch_dropped",
+        ), 0)
+        
+        # Shared availability model - grace window + hysteresis
+        self._available = True
+        self._last_success_time = time.time()
+        self._availability_failures = 0
+        self._availability_successes = 0
+        self.availability_grace = DEFAULT_AVAILABILITY_GRACE
+        self.availability_failure_threshold = DEFAULT_AVAILABILITY_FAILURES
+        self.availability_recovery_successes = 1
+        
+        # Optional device factory (e.g. trace replay) and traffic recorder
+        self._device_factory = None
+        self._recorder = None
+        self._gateway = None
+        self._exporter = None
+        
+        # Optional request pipelining (several frames in flight per socket)
+        self._pipelining = False
+        self._pipeline = None
+        
+        # Optional selective refresh of volatile DPs between full status polls
+        self._selective_refresh = False
+        self._full_refresh_interval = DEFAULT_FULL_REFRESH_INTERVAL
+        self._last_full_refresh = 0
+        
+        # Optional stale-while-revalidate: expired cache is served while a
+        # background refresh runs, callers only block past max staleness
+        self._stale_while_revalidate = False
+        self._max_staleness = DEFAULT_MAX_STALENESS
+        self._revalidate_task = None
+        
+        # Per-DP write coalescing (last writer wins within the window)
+        self._write_coalesce_window = DEFAULT_WRITE_COALESCE_WINDOW
+        self._pending_writes = {}
+        self._write_flushers = {}
+        
+        # Optional hot standby: a second, already handshaken connection -
+        # failover is a pointer swap instead of a rebuild
+        self._hot_standby = False
+        self._standby = None
+        self._standby_lock = threading.Lock()
+        self._standby_task = None
+        self._last_standby_keep_alive = 0
+        # (kind, seconds) per failover: "standby", "parallel" or "rebuild"
+        self.failover_times = deque(maxlen=100)
+        
+        # Optional token bucket shaping every outbound frame (0 = unlimited)
+        self._rate_limit = DEFAULT_RATE_LIMIT
+        self._rate_burst = DEFAULT_RATE_BURST
+        self._rate_limiter = None
+        
+        # watch() subscribers - replaced, never mutated, so publishing needs no lock
+        self._subscribers = frozenset()
         
         _LOGGER.info(f"✅ Manager v5.10 initialized")
         _LOGGER.info(f"   Device: {device_id} @ {ip_address}")
@@ -61,63 +156,529 @@ class PersistentDeviceManager:
     async def _ensure_device_initialized(self):
         if self._device_initialized:
             return
-        
-        async with self._init_lock:
+        await asyncio.to_thread(self._initialize_sync)
+
+    def _initialize_sync(self):
+        with self._connect_lock:
             if self._device_initialized:
                 return
             
+            since_failure = time.monotonic() - self._last_connect_failure
+            if since_failure < self._connect_retry_interval:
+                # Unreachable device - callers get the cache instead of one connect each
+                _LOGGER.debug(f"⏳ Connect retry in {self._connect_retry_interval - since_failure:.1f}s")
+                return
+
             _LOGGER.info(f"🔗 Initializing persistent connection")
-            await asyncio.to_thread(self._create_device_sync)
-            self._device_initialized = True
+            self._create_device_sync()
+            # A failed connect leaves _device None - try again on the next call
+            self._device_initialized = self._device is not None
 
-    def _create_device_sync(self):
-        try:
-            import tinytuya
-            
-            with self._device_lock:
-                self._device = tinytuya.Device(
-                    dev_id=self.device_id,
-                    address=self.ip_address,
-                    local_key=self.local_key,
-                    version=self.protocol_version,
-                )
-                
-                self._device.set_socketPersistent(True)
-                self._device.set_socketNODELAY(False)
-                self._device.heartbeat()
-            
+    def _count(self, key: str):
+        with self._state_lock:
+            self.stats[key] += 1
+
+    def _bump(self, attr: str) -> int:
+        """Increment an error counter, return the new value"""
+        with self._state_lock:
+            value = getattr(self, attr) + 1
+            setattr(self, attr, value)
+            return value
+
+    def _reset_error_counters(self):
+        with self._state_lock:
             self._error_914_count = 0
             self._timeout_count = 0
             self._consecutive_failures = 0
-            _LOGGER.info(f"✅ Persistent connection established")
-            
+
+    # option key -> (attribute, type)
+    TUNABLES = {
+        "min_cache_interval": ("_min_cache_interval", float),
+        "cache_validity": ("_cache_validity", float),
+        "status_timeout": ("_status_timeout", float),
+        "set_timeout": ("_set_timeout", float),
+        "entity_timeout": ("entity_timeout", float),
+        "socket_timeout": ("_socket_timeout", float),
+        "socket_nodelay": ("_socket_nodelay", bool),
+        "pipelining": ("_pipelining", bool),
+        "selective_refresh": ("_selective_refresh", bool),
+        "full_refresh_interval": ("_full_refresh_interval", float),
+        "stale_while_revalidate": ("_stale_while_revalidate", bool),
+        "max_staleness": ("_max_staleness", float),
+        "write_coalesce_window": ("_write_coalesce_window", float),
+        "hot_standby": ("_hot_standby", bool),
+        "rate_limit": ("_rate_limit", float),
+        "rate_burst": ("_rate_burst", float),
+        "availability_grace": ("availability_grace", float),
+        "availability_failure_threshold": ("availability_failure_threshold", int),
+    }
+
+    def apply_options(self, options: dict):
+        """Apply performance tunables to the running manager - no reconnect"""
+        changed = []
+        for key, (attr, cast) in self.TUNABLES.items():
+            if key not in options:
+                continue
+            value = cast(options[key])
+            if getattr(self, attr) != value:
+                setattr(self, attr, value)
+                changed.append(f"{key}={value}")
+
+        if not changed:
+            return
+
+        # Socket options and the pipeline switch wait for the device lock, held
+        # for a whole request - the next worker-thread call applies them
+        self._device_options_stale = True
+        if not self._hot_standby:
+            self._drop_standby()
+        self._sync_rate_limiter()
+        _LOGGER.info(f"⚙️ Options applied: {', '.join(changed)}")
+
+    def _sync_device_options(self):
+        """Apply changed socket options and pipelining to the live device (worker thread)"""
+        with self._device_lock:
+            if not self._device_options_stale:
+                return
+            self._device_options_stale = False
+            if self._device is not None:
+                self._apply_socket_options(self._device)
+                self._sync_pipeline()
+
+    def _sync_rate_limiter(self):
+        if self._rate_limit <= 0:
+            self._rate_limiter = None
+        elif self._rate_limiter is None:
+            from .rate_limiter import TokenBucket
+
+            self._rate_limiter = TokenBucket(self._rate_limit, self._rate_burst)
+        else:
+            self._rate_limiter.configure(self._rate_limit, self._rate_burst)
+
+    def _record_throttle(self, delay: float):
+        with self._state_lock:
+            self.stats["throttled"] += 1
+            self.stats["throttled_ms"] += int(delay * 1000)
+        _LOGGER.debug(f"🚦 Frame held {delay * 1000:.0f} ms by the rate limit")
+
+    async def _throttle(self):
+        """Wait for a send slot - before the device timeout starts, queued time is not a timeout"""
+        limiter = self._rate_limiter
+        if limiter is not None:
+            delay = await limiter.acquire()
+            if delay:
+                self._record_throttle(delay)
+
+    def _throttle_sync(self):
+        """_throttle() for frames sent from worker threads (connect, keep-alive)"""
+        limiter = self._rate_limiter
+        if limiter is not None:
+            delay = limiter.acquire_sync()
+            if delay:
+                self._record_throttle(delay)
+
+    def _apply_socket_options(self, device):
+        device.set_socketPersistent(True)
+        device.set_socketNODELAY(self._socket_nodelay)
+        if hasattr(device, "set_socketTimeout"):
+            device.set_socketTimeout(self._socket_timeout)
+
+    @property
+    def available(self) -> bool:
+        """Debounced availability shared by all entities of this device"""
+        return self._available
+
+    @property
+    def cache_age(self) -> Optional[float]:
+        """Seconds since the cached status was fetched, None when there is no fetch time"""
+        cache_time = self._cache_time
+        if not cache_time:
+            return None
+        return max(0.0, time.time() - cache_time)
+
+    def record_success(self):
+        """Successful contact with the device"""
+        with self._state_lock:
+            self._last_success_time = time.time()
+            self._availability_failures = 0
+            if self._available:
+                return
+            self._availability_successes += 1
+            if self._availability_successes < self.availability_recovery_successes:
+                return
+            self._available = True
+            self._availability_successes = 0
+        _LOGGER.info(f"✅ Device available again")
+
+    def record_failure(self):
+        """Failed contact - goes unavailable only after the threshold AND the grace window"""
+        with self._state_lock:
+            self._availability_failures += 1
+            self._availability_successes = 0
+            if not self._available:
+                return
+            silent_for = time.time() - self._last_success_time
+            if (self._availability_failures < self.availability_failure_threshold
+                    or silent_for < self.availability_grace):
+                return
+            self._available = False
+            failures = self._availability_failures
+        _LOGGER.warning(
+            f"⚠️ Device unavailable - {failures} failures, "
+            f"no contact for {silent_for:.0f}s"
+        )
+
+    def set_device_factory(self, factory):
+        """Use factory() instead of tinytuya.Device (None restores the default)"""
+        self._device_factory = factory
+        self._device_initialized = False
+        self._connect_retry_interval = 0.0
+        with self._device_lock:
+            self._close_pipeline()
+            old, self._device = self._device, None
+        self._close_device(old)
+        self._drop_standby()
+
+    def start_recording(self, path: str):
+        """Record raw device traffic to path (takes effect on next connect)"""
+        from .traffic_recorder import TrafficRecorder, RecordingDevice
+
+        self.stop_recording()
+        self._recorder = TrafficRecorder(path)
+        with self._device_lock:
+            if self._device is not None:
+                self._device = RecordingDevice(self._device, self._recorder)
+        return self._recorder
+
+    def stop_recording(self):
+        if self._recorder is None:
+            return
+        recorder, self._recorder = self._recorder, None
+        with self._device_lock:
+            if self._device is not None and hasattr(self._device, "_recorder"):
+                self._device = self._device._device
+        recorder.close()
+
+    async def start_gateway(self, host: str, port: int):
+        """Serve this device to other local consumers (gateway mode)"""
+        from .gateway import DeviceGateway
+
+        if self._gateway is not None:
+            if (self._gateway.host, self._gateway.port) == (host, port):
+                return self._gateway
+            await self.stop_gateway()
+        gateway = DeviceGateway(self, host, port)
+        await gateway.start()
+        self._gateway = gateway
+        return gateway
+
+    async def stop_gateway(self):
+        if self._gateway is None:
+            return
+        gateway, self._gateway = self._gateway, None
+        await gateway.stop()
+
+    async def start_telemetry(self, directory: str, **kwargs):
+        """Export this device's snapshots as a time series (shared exporter per directory)"""
+        from .telemetry_exporter import TelemetryExporter
+
+        exporter = TelemetryExporter.shared(directory, **kwargs)
+        if exporter is self._exporter:
+            return exporter
+        await self.stop_telemetry()
+        await exporter.add_device(self.device_id)
+        self._exporter = exporter
+        return exporter
+
+    async def stop_telemetry(self):
+        if self._exporter is None:
+            return
+        exporter, self._exporter = self._exporter, None
+        await exporter.remove_device(self.device_id)
+
+    def _sync_pipeline(self):
+        """Start or stop the pipeline to match the option (device lock held)"""
+        if self._pipelining and self._pipeline is None and self._device is not None:
+            transport = self._pipeline_transport(self._device)
+            if transport is None:
+                _LOGGER.warning(f"⚠️ Pipelining not supported by this device backend")
+                return
+            from .pipeline import RequestPipeline
+
+            self._pipeline = RequestPipeline(transport, self._on_unsolicited)
+            _LOGGER.info(f"🚀 Pipelining enabled")
+        elif not self._pipelining and self._pipeline is not None:
+            self._close_pipeline()
+
+    def _pipeline_transport(self, device):
+        if self._recorder is not None:
+            return None
+        if hasattr(device, "pipeline_transport"):
+            return device.pipeline_transport()
+        from .pipeline import TinyTuyaTransport
+
+        if TinyTuyaTransport.supports(device):
+            return TinyTuyaTransport(device)
+        return None
+
+    def _close_pipeline(self):
+        pipeline, self._pipeline = self._pipeline, None
+        if pipeline is not None:
+            pipeline.close()
+
+    def _on_unsolicited(self, decoded: dict):
+        """Status push from the device - merge into the cache"""
+        data = self._normalize_response(decoded)
+        if not data or not data.get("dps"):
+            return
+        with self._state_lock:
+            if not self._cached_status:
+                return
+            merged = dict(self._cached_status.get("dps", {}))
+            merged.update(data["dps"])
+            self._cached_status = {**self._cached_status, "dps": merged}
+        if self._exporter is not None:
+            self._exporter.observe(self.device_id, merged)
+        self._publish(merged)
+        _LOGGER.debug(f"📬 Pushed update merged: {data['dps']}")
+
+    def _device_call(self, op: str, *args):
+        """One device request - pipelined when enabled, else under the device lock"""
+        if self._device_options_stale:
+            self._sync_device_options()
+        pipeline = self._pipeline
+        if pipeline is not None:
+            generation = self._generation
+            timeout = self._status_timeout if op == "status" else self._set_timeout
+            try:
+                return pipeline.request(op, *args, timeout=timeout)
+            except ConnectionError:
+                if pipeline.closed and pipeline is self._pipeline:
+                    # Send failed and closed the pipeline - replace the connection now
+                    self._reconnect_sync(generation)
+                raise
+        with self._device_lock:
+            if self._device:
+                return getattr(self._device, op)(*args)
+        return None
+
+    def _use_selective_refresh(self, now: float) -> bool:
+        """Volatile-DP refresh only between full polls, with a complete baseline"""
+        return (
+            self._selective_refresh
+            and self._pipeline is None
+            and self._last_complete_response is not None
+            and now - self._last_full_refresh < self._full_refresh_interval
+            and hasattr(self._device, "updatedps")
+        )
+
+    def _selective_status_sync(self):
+        """UPDATEDPS for the volatile DPs only - the device answers with just those"""
+        if self._device_options_stale:
+            self._sync_device_options()
+        with self._device_lock:
+            if not self._device:
+                return None
+            response = self._device.updatedps(VOLATILE_DPS)
+            if not (isinstance(response, dict) and (response.get("dps") or self._is_error_914(response))):
+                # Device only acked the request - the refreshed DPs follow as a push
+                response = self._device.receive()
+            return response
+
+    def _build_device(self):
+        if self._device_factory is not None:
+            device = self._device_factory()
+        else:
+            import tinytuya
+
+            device = tinytuya.Device(
+                dev_id=self.device_id,
+                address=self.ip_address,
+                local_key=self.local_key,
+                version=self.protocol_version,
+            )
+        if self._recorder is not None:
+            from .traffic_recorder import RecordingDevice
+
+            device = RecordingDevice(device, self._recorder)
+        return device
+
+    def _create_device_sync(self):
+        device = None
+        try:
+            self._throttle_sync()
+            device = self._build_device()
+            self._apply_socket_options(device)
+            device.heartbeat()
         except Exception as e:
             _LOGGER.error(f"❌ Connection failed: {type(e).__name__}: {e}")
+            self._close_device(device)
+            self._last_connect_failure = time.monotonic()
+            self._connect_retry_interval = min(10.0, max(1.0, self._connect_retry_interval * 2))
+            return
+
+        # Published only after the handshake - other callers never see a half-built device
+        with self._device_lock:
+            self._device = device
+            self._sync_pipeline()
+            self._generation += 1
+        self._connect_retry_interval = 0.0
+        self._reset_error_counters()
+        _LOGGER.info(f"✅ Persistent connection established")
+
+    def _reconnect_sync(self, generation: Optional[int] = None):
+        """Replace the connection - skipped when it was already replaced since `generation`"""
+        with self._connect_lock:
+            if generation is not None and generation != self._generation:
+                _LOGGER.debug(f"🔄 Reconnect skipped - connection already replaced")
+                return
+            _LOGGER.warning(f"🔄 Reconnecting to device...")
+            self._count("reconnects")
+            started = time.monotonic()
+            if self._hot_standby and self._failover_sync(started):
+                return
             with self._device_lock:
-                self._device = None
+                self._close_pipeline()
+                old, self._device = self._device, None
+            self._device_initialized = False
+            self._close_device(old)
+            self._create_device_sync()
+            self._device_initialized = self._device is not None
+            if self._device is not None:
+                self.failover_times.append(("rebuild", time.monotonic() - started))
+
+    def _failover_sync(self, started: float) -> bool:
+        """Swap in the standby, or a replacement built while the old device is still in place"""
+        with self._standby_lock:
+            replacement, self._standby = self._standby, None
+        kind = "standby"
+        if replacement is not None:
+            # An idle standby may have been dropped by the device - verify before swapping
+            try:
+                self._throttle_sync()
+                replacement.heartbeat()
+            except Exception as e:
+                _LOGGER.warning(f"⚠️ Standby connection dead: {type(e).__name__}: {e}")
+                self._close_device(replacement)
+                replacement = None
+        if replacement is None:
+            kind = "parallel"
+            try:
+                replacement = self._connect_spare()
+            except Exception as e:
+                _LOGGER.warning(f"⚠️ Replacement connection failed: {type(e).__name__}: {e}")
+                return False
 
-    def _reconnect_sync(self):
-        _LOGGER.warning(f"🔄 Reconnecting to device...")
         with self._device_lock:
-            self._device = None
-        self._device_initialized = False
-        self._create_device_sync()
+            self._close_pipeline()
+            old, self._device = self._device, replacement
+            self._sync_pipeline()
+            self._generation += 1
+        self._device_initialized = True
+        self._reset_error_counters()
+
+        elapsed = time.monotonic() - started
+        self.failover_times.append((kind, elapsed))
+        self._count("failovers")
+        self._close_device(old)
+        _LOGGER.info(f"🔁 Failover to {kind} connection in {elapsed * 1000:.1f} ms")
+        return True
+
+    def _connect_spare(self):
+        """New device with a completed handshake - not yet used for requests"""
+        device = self._build_device()
+        try:
+            self._apply_socket_options(device)
+            self._throttle_sync()
+            device.heartbeat()
+        except Exception:
+            self._close_device(device)
+            raise
+        return device
+
+    def _schedule_standby(self):
+        """Build the standby in the background once the primary is healthy, then keep it alive"""
+        if not self._hot_standby:
+            return
+        if self._standby_task is not None and not self._standby_task.done():
+            return
+        if self._standby is None:
+            job = self._build_standby_sync
+        elif time.time() - self._last_standby_keep_alive > KEEP_ALIVE_INTERVAL:
+            job = self._standby_keep_alive_sync
+        else:
+            return
+        self._standby_task = asyncio.get_running_loop().create_task(asyncio.to_thread(job))
+
+    def _build_standby_sync(self):
+        try:
+            device = self._connect_spare()
+        except Exception as e:
+            _LOGGER.debug(f"Standby connection failed: {type(e).__name__}: {e}")
+            return
+        with self._standby_lock:
+            if self._hot_standby and self._standby is None:
+                self._standby, device = device, None
+        if device is not None:
+            self._close_device(device)
+            return
+        self._last_standby_keep_alive = time.time()
+        self._count("standby_builds")
+        _LOGGER.debug(f"🔁 Standby connection ready")
+
+    def _drop_standby(self):
+        with self._standby_lock:
+            standby, self._standby = self._standby, None
+        self._close_device(standby)
+
+    @staticmethod
+    def _close_device(device):
+        close = getattr(device, "close", None)
+        if callable(close):
+            try:
+                close()
+            except Exception:
+                pass
 
     def _do_keep_alive_sync(self):
         try:
-            with self._device_lock:
-                if self._device and hasattr(self._device, 'heartbeat'):
-                    self._device.heartbeat()
+            if self._device and hasattr(self._device, 'heartbeat'):
+                self._throttle_sync()
+                self._device_call("heartbeat")
             _LOGGER.debug(f"💓 Keep-alive sent")
             self._last_keep_alive = time.time()
         except Exception as e:
             _LOGGER.debug(f"Keep-alive failed: {e}")
 
+    def _standby_keep_alive_sync(self):
+        """Heartbeat the idle standby - taken out of its slot meanwhile, so a failover never shares it"""
+        with self._standby_lock:
+            standby, self._standby = self._standby, None
+        if standby is None:
+            return
+        try:
+            self._throttle_sync()
+            standby.heartbeat()
+        except Exception as e:
+            # Dead spare - rebuilt on the next successful request
+            _LOGGER.debug(f"Standby keep-alive failed: {e}")
+            self._close_device(standby)
+            return
+        self._last_standby_keep_alive = time.time()
+        with self._standby_lock:
+            if self._hot_standby and self._standby is None:
+                self._standby, standby = standby, None
+        self._close_device(standby)
+
     async def _async_check_keep_alive(self):
-        now = time.time()
-        if now - self._last_keep_alive > 30:
-            _LOGGER.debug(f"🔄 Keep-alive due")
-            await asyncio.to_thread(self._do_keep_alive_sync)
+        with self._state_lock:
+            now = time.time()
+            if now - self._last_keep_alive <= 30:
+                return
+            # Claimed here so concurrent writers send one heartbeat, not one each
+            self._last_keep_alive = now
+        _LOGGER.debug(f"🔄 Keep-alive due")
+        await asyncio.to_thread(self._do_keep_alive_sync)
 
     def _is_error_914(self, response: dict) -> bool:
         if not isinstance(response, dict):
@@ -178,55 +739,109 @@ class PersistentDeviceManager:
     async def get_status(self) -> Optional[dict]:
         await self._ensure_device_initialized()
         
+        with self._state_lock:
+            cached, cache_time, invalidated = self._cached_status, self._cache_time, self._cache_invalidated
+
         if not self._device:
             _LOGGER.error(f"❌ Device not initialized")
-            return self._cached_status if self._cached_status else {}
+            self.record_failure()
+            return cached if cached else {}
 
         now = time.time()
-        cache_age = now - self._cache_time
+        cache_age = now - cache_time
 
-        if self._cached_status and cache_age < self._cache_validity:
-            _LOGGER.debug(f"📦 Cache hit (age: {cache_age:.1f}s, dps count: {len(self._cached_status.get('dps', {}))})")
-            return self._cached_status
+        if cached and not invalidated and cache_age < self._cache_validity:
+            _LOGGER.debug(f"📦 Cache hit (age: {cache_age:.1f}s, dps count: {len(cached.get('dps', {}))})")
+            return cached
 
-        if cache_age < self._min_cache_interval:
+        if not invalidated and cache_age < self._min_cache_interval:
             _LOGGER.debug(f"⏳ Min interval not met")
-            return self._cached_status
+            return cached
+
+        if (self._stale_while_revalidate and cached
+                and cache_age < self._max_staleness):
+            # Serve stale data now, refresh once in the background
+            self._start_revalidation()
+            _LOGGER.debug(f"♻️ Serving stale cache (age: {cache_age:.1f}s), revalidating")
+            return {**cached, "age": round(cache_age, 1)}
 
         if self._fetching:
             _LOGGER.debug(f"🔄 Already fetching")
-            return self._cached_status
+            return cached
 
+        return await self._fetch_status(now)
+
+    def _start_revalidation(self):
+        if self._fetching:
+            return
+        if self._revalidate_task is not None and not self._revalidate_task.done():
+            return
+        self._revalidate_task = asyncio.get_running_loop().create_task(self._fetch_status(time.time()))
+
+    async def _fetch_status(self, now: float) -> dict:
+        # One status request in flight per device, whichever loop or thread asks
+        with self._state_lock:
+            if self._fetching:
+                _LOGGER.debug(f"🔄 Already fetching")
+                return self._cached_status
+            self._fetching = True
+            write_seq = self._write_seq
+        try:
+            return await self._fetch_status_attempts(now, write_seq)
+        finally:
+            self._fetching = False
+
+    async def _fetch_status_attempts(self, now: float, write_seq: int) -> dict:
         max_retries = 2
         for attempt in range(max_retries):
+            # Waiting for a send slot is not a device failure - outside the try,
+            # so a caller cancelled while queued records nothing
+            await self._throttle()
+            generation = self._generation
             try:
-                self._fetching = True
-                _LOGGER.debug(f"📡 Fetching status (attempt {attempt + 1}/{max_retries})")
-                
-                def _get_device_status():
-                    with self._device_lock:
-                        if self._device:
-                            return self._device.status()
-                    return None
-                
-                raw_data = await asyncio.wait_for(
-                    asyncio.to_thread(_get_device_status),
-                    timeout=self._status_timeout
+                selective = self._use_selective_refresh(now)
+                _LOGGER.debug(
+                    f"📡 Fetching {'volatile DPs' if selective else 'status'} (attempt {attempt + 1}/{max_retries})"
                 )
+                self._count("selective_requests" if selective else "status_requests")
+                
+                if selective:
+                    raw_data = await asyncio.wait_for(
+                        asyncio.to_thread(self._selective_status_sync),
+                        timeout=self._status_timeout
+                    )
+                else:
+                    raw_data = await asyncio.wait_for(
+                        asyncio.to_thread(self._device_call, "status"),
+                        timeout=self._status_timeout
+                    )
                 
                 _LOGGER.debug(f"📨 Raw response: {raw_data}")
                 
                 if self._is_error_914(raw_data):
                     _LOGGER.error(f"❌ Error 914 - Device rejected request")
-                    self._error_914_count += 1
-                    if self._error_914_count >= 2:
-                        await asyncio.to_thread(self._reconnect_sync)
+                    self._count("errors_914")
+                    self.record_failure()
+                    if self._bump("_error_914_count") >= 2:
+                        await asyncio.to_thread(self._reconnect_sync, generation)
                     return self._cached_status if self._cached_status else {}
 
                 # Normalize response to handle both formats
                 data = self._normalize_response(raw_data)
                 
+                if selective and data and isinstance(data.get("dps"), dict) and data["dps"]:
+                    # Merge fresh volatile DPs over the last complete snapshot
+                    merged = dict(self._last_complete_response.get("dps", {}))
+                    merged.update(data["dps"])
+                    data = {"dps": merged}
+                elif selective:
+                    # Nothing usable - resync with a full status next attempt
+                    self._last_full_refresh = 0
+                elif data and len(data.get("dps") or {}) > 1:
+                    self._last_full_refresh = now
+
                 if not self._validate_response(data):
+                    self._count("invalid")
                     if attempt < max_retries - 1:
                         _LOGGER.warning(f"⚠️ Invalid response, retrying...")
                         await asyncio.sleep(0.5)
@@ -241,101 +856,248 @@ class PersistentDeviceManager:
 
                 # SUCCESS
                 dps_count = len(data.get("dps", {}))
-                self._error_914_count = 0
-                self._timeout_count = 0
-                self._consecutive_failures = 0
+                self._reset_error_counters()
+                self.record_success()
+                self._count("status_ok")
                 
-                # Save as last complete if has good data
-                if dps_count > 1:  # More than just humidity
-                    self._last_complete_response = data
+                with self._state_lock:
+                    # Writes acknowledged while this request was in flight win
+                    # over what the device answered before applying them
+                    data = self._overlay_writes(data, write_seq)
+                    # Save as last complete if has good data
+                    if dps_count > 1:  # More than just humidity
+                        self._last_complete_response = data
+                    elif self._last_complete_response:
+                        data = self._last_complete_response
+                    self._cached_status = data
+                    self._cache_time = now
+                    # Not fresh if a write landed meanwhile - the next read refreshes
+                    self._cache_invalidated = self._write_seq != write_seq
+
+                if dps_count > 1:
                     _LOGGER.info(f"✅ Status fresh - complete response with {dps_count} dps")
                 else:
                     _LOGGER.warning(f"⚠️ Status incomplete - only {dps_count} dps, using last complete")
-                    if self._last_complete_response:
-                        data = self._last_complete_response
+                    self._count("partial")
+                    if data is self._last_complete_response:
                         _LOGGER.info(f"✅ Using last complete response with {len(data.get('dps', {}))} dps")
                 
-                self._cached_status = data
-                self._cache_time = now
+                if self._exporter is not None:
+                    self._exporter.observe(self.device_id, data["dps"])
+                self._publish(data["dps"])
+                self._schedule_standby()
                 return data
 
             except asyncio.TimeoutError:
                 _LOGGER.error(f"❌ TIMEOUT after {self._status_timeout}s (attempt {attempt + 1}/{max_retries})")
-                self._timeout_count += 1
-                self._consecutive_failures += 1
+                self._bump("_timeout_count")
+                self._count("timeouts")
+                self.record_failure()
                 
-                if self._consecutive_failures >= 3:
-                    await asyncio.to_thread(self._reconnect_sync)
-                    self._consecutive_failures = 0
+                if self._bump("_consecutive_failures") >= 3:
+                    await asyncio.to_thread(self._reconnect_sync, generation)
                 
                 if attempt < max_retries - 1:
                     await asyncio.sleep(1)
 
+            except asyncio.CancelledError:
+                # The caller's entity_timeout ran out first - still a device that did not answer
+                self.record_failure()
+                raise
+
             except Exception as e:
                 _LOGGER.error(f"❌ EXCEPTION: {type(e).__name__}: {e} (attempt {attempt + 1}/{max_retries})")
-                self._consecutive_failures += 1
+                self._count("exceptions")
+                self.record_failure()
                 
-                if self._consecutive_failures >= 3:
-                    await asyncio.to_thread(self._reconnect_sync)
-                    self._consecutive_failures = 0
+                if self._bump("_consecutive_failures") >= 3:
+                    await asyncio.to_thread(self._reconnect_sync, generation)
                 
                 if attempt < max_retries - 1:
                     await asyncio.sleep(1)
 
-            finally:
-                self._fetching = False
-
         return self._cached_status if self._cached_status else {}
 
+    def _overlay_writes(self, data: dict, since_seq: int) -> dict:
+        """data with every write acknowledged after since_seq applied (state lock held)"""
+        newer = {dp: value for dp, (seq, value) in self._recent_writes.items() if seq > since_seq}
+        if not newer:
+            return data
+        return {**data, "dps": {**data["dps"], **newer}}
+
+    def _apply_write(self, dp: str, value):
+        """Acknowledged write - readers see it at once, the next read refreshes"""
+        dp = str(dp)
+        with self._state_lock:
+            self._write_seq += 1
+            self._recent_writes[dp] = (self._write_seq, value)
+            if self._cached_status.get("dps"):
+                self._cached_status = self._overlay_writes(self._cached_status, self._write_seq - 1)
+            if self._last_complete_response:
+                self._last_complete_response = self._overlay_writes(self._last_complete_response, self._write_seq - 1)
+            self._cache_invalidated = True
+            self._last_full_refresh = 0  # config DP changed - resync with a full status
+            cached = self._cached_status
+        if cached.get("dps"):
+            self._publish(cached["dps"])
+
+    def _publish(self, dps: dict):
+        for subscription in self._subscribers:
+            subscription.offer(dps)
+
+    async def watch(self, dps: Optional[Iterable] = None, deltas: bool = False, changes_only: bool = True,
+                    maxsize: int = 16, overflow: str = "drop_oldest",
+                    poll_interval: Optional[float] = None) -> AsyncIterator[dict]:
+        """Stream device updates: `async for update in manager.watch(dps=["14"]):`
+
+        Yields {"dps": {...}} - the snapshot (limited to `dps` when given),
+        or with deltas=True only the DPs that changed. Starts with the
+        current cached state. Updates come from whatever refreshes the
+        manager (entity polls, writes, pushes); poll_interval adds a
+        get_status() loop for consumers without one - it goes through the
+        cache, so several watchers do not multiply device traffic.
+        Each subscriber has its own queue of `maxsize` updates; when it is
+        full `overflow` decides: "drop_oldest" or "coalesce_latest".
+        """
+        from .subscriptions import Subscription
+
+        subscription = Subscription(dps, deltas, changes_only, maxsize, overflow,
+                                    on_drop=lambda: self._count("watch_dropped"))
+        with self._state_lock:
+            self._subscribers = self._subscribers | {subscription}
+            current = self._cached_status
+        if current.get("dps"):
+            subscription.offer(current["dps"])
+
+        poller = None
+        if poll_interval:
+            poller = asyncio.get_running_loop().create_task(self._watch_poll(poll_interval))
+        _LOGGER.debug(f"👀 Watcher added ({len(self._subscribers)} active)")
+        try:
+            while True:
+                yield await subscription.get()
+        finally:
+            with self._state_lock:
+                self._subscribers = self._subscribers - {subscription}
+            if poller is not None:
+                poller.cancel()
+            _LOGGER.debug(f"👀 Watcher removed ({subscription.delivered} delivered, "
+                          f"{subscription.dropped} dropped)")
+
+    async def _watch_poll(self, interval: float):
+        while True:
+            try:
+                await self.get_status()
+            except Exception as e:
+                _LOGGER.debug(f"Watch poll failed: {e}")
+            await asyncio.sleep(interval)
+
     async def set_value(self, dp: str, value) -> bool:
+        """Write a DP - writes to the same DP within the coalesce window collapse into one"""
+        if self._write_coalesce_window <= 0:
+            return await self._set_value_now(dp, value)
+
+        # Batches are per event loop - a future can only be awaited on its own loop
+        loop = asyncio.get_running_loop()
+        key = (loop, dp)
+        pending = self._pending_writes.get(key)
+        if pending is not None:
+            # Last writer wins - everyone gets the outcome of the final value
+            _LOGGER.debug(f"🔀 DP {dp}: {pending['value']} superseded by {value}")
+            pending["value"] = value
+            self._count("writes_superseded")
+        else:
+            pending = {"value": value, "future": loop.create_future()}
+            self._pending_writes[key] = pending
+            if key not in self._write_flushers:
+                # Flushed by its own task so a cancelled caller can't strand the others
+                self._write_flushers[key] = loop.create_task(self._flush_writes(key))
+        return await asyncio.shield(pending["future"])
+
+    async def _flush_writes(self, key: tuple):
+        """One flusher per DP and loop - batches reach the device strictly in order"""
+        try:
+            await asyncio.sleep(self._write_coalesce_window)
+            while True:
+                # Later writes start a new batch from here on
+                pending = self._pending_writes.pop(key, None)
+                if pending is None:
+                    return
+                await self._flush_batch(key[1], pending)
+                # Writes made while this one was in flight formed the next
+                # batch - it has waited at least a window already
+        finally:
+            self._write_flushers.pop(key, None)
+            leftover = self._pending_writes.pop(key, None)
+            if leftover is not None:
+                leftover["future"].cancel()
+
+    async def _flush_batch(self, dp: str, pending: dict):
+        try:
+            result = await self._set_value_now(dp, pending["value"])
+        except asyncio.CancelledError:
+            pending["future"].cancel()
+            raise
+        except Exception as e:
+            if not pending["future"].done():
+                pending["future"].set_exception(e)
+            return
+        if not pending["future"].done():
+            pending["future"].set_result(result)
+
+    async def _set_value_now(self, dp: str, value) -> bool:
         await self._ensure_device_initialized()
         
         if not self._device:
             _LOGGER.error(f"❌ Device not initialized for set")
+            self.record_failure()
             return False
 
         await self._async_check_keep_alive()
+        await self._throttle()
+        generation = self._generation
 
         try:
             _LOGGER.debug(f"✏️ Setting DP {dp} = {value}")
-            
-            def _set_device_value():
-                with self._device_lock:
-                    if self._device:
-                        return self._device.set_value(dp, value)
-                return None
+            self._count("set_requests")
             
             response = await asyncio.wait_for(
-                asyncio.to_thread(_set_device_value),
+                asyncio.to_thread(self._device_call, "set_value", dp, value),
                 timeout=self._set_timeout
             )
             
             if self._is_error_914(response):
                 _LOGGER.error(f"❌ Error 914 on set: {response}")
-                self._error_914_count += 1
-                if self._error_914_count >= 2:
-                    await asyncio.to_thread(self._reconnect_sync)
+                self._count("errors_914")
+                self.record_failure()
+                if self._bump("_error_914_count") >= 2:
+                    await asyncio.to_thread(self._reconnect_sync, generation)
                 return False
 
-            self._error_914_count = 0
-            self._timeout_count = 0
-            self._consecutive_failures = 0
-            self._cache_time = 0
+            self._reset_error_counters()
+            self.record_success()
+            self._count("set_ok")
+            self._apply_write(dp, value)
+            self._schedule_standby()
             _LOGGER.info(f"✅ DP {dp} set to {value}")
             return True
 
         except asyncio.TimeoutError:
             _LOGGER.error(f"❌ SET TIMEOUT after {self._set_timeout}s")
-            self._consecutive_failures += 1
-            if self._consecutive_failures >= 3:
-                await asyncio.to_thread(self._reconnect_sync)
-                self._consecutive_failures = 0
+            self._count("timeouts")
+            self.record_failure()
+            if self._bump("_consecutive_failures") >= 3:
+                await asyncio.to_thread(self._reconnect_sync, generation)
             return False
 
+        except asyncio.CancelledError:
+            self.record_failure()
+            raise
+
         except Exception as e:
             _LOGGER.error(f"❌ SET EXCEPTION: {type(e).__name__}: {e}")
-            self._consecutive_failures += 1
-            if self._consecutive_failures >= 3:
-                await asyncio.to_thread(self._reconnect_sync)
-                self._consecutive_failures = 0
+            self._count("exceptions")
+            self.record_failure()
+            if self._bump("_consecutive_failures") >= 3:
+                await asyncio.to_thread(self._reconnect_sync, generation)
             return False
@@ -0,0 +1,221 @@
+"""Device Gateway - v1.0 - Share one device session between several consumers
+
+The manager keeps the only connection to the device. Local clients talk
+to the gateway with newline-delimited JSON:
+
+    -> {"id": 1, "op": "status"}
+    <- {"id": 1, "ok": true, "dps": {...}, "age": 2.1}
+    -> {"id": 2, "op": "set", "dp": "101", "value": "55RH"}
+    <- {"id": 2, "ok": true}
+    -> {"id": 3, "op": "ping"}
+    <- {"id": 3, "ok": true}
+
+Reads are answered from the manager cache ("age" is null when the cache
+has no fetch time yet), writes are serialized.
+"""
+
+import asyncio
+import json
+import logging
+import socket
+import threading
+from typing import Optional
+
+from .const import DEFAULT_GATEWAY_HOST, DEFAULT_GATEWAY_PORT
+
+_LOGGER = logging.getLogger(__name__)
+
+MAX_LINE = 64 * 1024
+
+
+# Same shape tinytuya returns for ERR_KEY_OR_VER
+ERROR_914 = {"Error": "Check device key or version", "Err": "914", "Payload": None}
+
+
+class GatewayError(Exception):
+    """Request rejected or failed on the gateway side"""
+
+
+class DeviceGateway:
+    """TCP endpoint in front of a PersistentDeviceManager"""
+
+    def __init__(self, manager, host: str = DEFAULT_GATEWAY_HOST, port: int = DEFAULT_GATEWAY_PORT):
+        self._manager = manager
+        self.host = host
+        self.port = port
+        self._server: Optional[asyncio.base_events.Server] = None
+        self._write_lock = asyncio.Lock()
+        self._clients = {}
+        self.requests = 0
+        self.writes = 0
+
+    @property
+    def running(self) -> bool:
+        return self._server is not None
+
+    async def start(self):
+        self._server = await asyncio.start_server(
+            self._handle_client, self.host, self.port, limit=MAX_LINE
+        )
+        if not self.port:
+            self.port = self._server.sockets[0].getsockname()[1]
+        _LOGGER.info(f"🌐 Gateway listening on {self.host}:{self.port} for {self._manager.device_id}")
+
+    async def stop(self):
+        if self._server is None:
+            return
+        self._server.close()
+        tasks = list(self._clients.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self._server.wait_closed()
+        self._server = None
+        _LOGGER.info(f"🌐 Gateway stopped ({self.requests} requests, {self.writes} writes)")
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        peer = writer.get_extra_info("peername")
+        self._clients[writer] = asyncio.current_task()
+        _LOGGER.debug(f"🌐 Gateway client connected: {peer}")
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (asyncio.LimitOverrunError, ValueError):
+                    _LOGGER.warning(f"⚠️ Gateway client {peer} sent an oversized line")
+                    break
+                if not line:
+                    break
+                reply = await self._handle_line(line)
+                writer.write(json.dumps(reply, separators=(",", ":")).encode() + b"\n")
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except asyncio.CancelledError:
+            # Gateway stopping - end quietly (streams report cancelled handlers as errors)
+            pass
+        finally:
+            self._clients.pop(writer, None)
+            writer.close()
+            _LOGGER.debug(f"🌐 Gateway client disconnected: {peer}")
+
+    async def _handle_line(self, line: bytes) -> dict:
+        try:
+            request = json.loads(line)
+        except ValueError:
+            return {"ok": False, "error": "invalid json"}
+        if not isinstance(request, dict):
+            return {"ok": False, "error": "invalid request"}
+
+        self.requests += 1
+        reply = {"id": request.get("id")}
+        op = request.get("op")
+        try:
+            if op == "status":
+                data = await self._manager.get_status()
+                age = self._manager.cache_age
+                reply.update(ok=bool(data), dps=(data or {}).get("dps", {}),
+                             age=None if age is None else round(age, 3))
+            elif op == "set":
+                async with self._write_lock:
+                    self.writes += 1
+                    reply["ok"] = await self._manager.set_value(str(request["dp"]), request["value"])
+            elif op == "ping":
+                reply["ok"] = True
+            else:
+                reply.update(ok=False, error=f"unknown op: {op}")
+        except KeyError as e:
+            reply.update(ok=False, error=f"missing field: {e}")
+        except Exception as e:
+            _LOGGER.error(f"❌ Gateway {op} failed: {type(e).__name__}: {e}")
+            reply.update(ok=False, error=type(e).__name__)
+        return reply
+
+
+class GatewayDevice:
+    """tinytuya.Device stand-in that goes through a remote DeviceGateway
+
+    Lets a second manager (another HA instance, a monitoring script)
+    share the gateway's device session:
+
+        manager.set_device_factory(GatewayDevice.factory("192.168.1.10", 6680))
+    """
+
+    def __init__(self, host: str, port: int = DEFAULT_GATEWAY_PORT, timeout: float = 10.0):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self._sock: Optional[socket.socket] = None
+        self._file = None
+        self._lock = threading.Lock()
+        self._next_id = 0
+
+    @classmethod
+    def factory(cls, host: str, port: int = DEFAULT_GATEWAY_PORT, timeout: float = 10.0):
+        return lambda: cls(host, port, timeout)
+
+    def _connect(self):
+        self._sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        self._file = self._sock.makefile("rb")
+
+    def _close(self):
+        if self._sock is not None:
+            try:
+                self._file.close()
+                self._sock.close()
+            except OSError:
+                pass
+        self._sock = None
+        self._file = None
+
+    def close(self):
+        self._close()
+
+    def _request(self, request: dict) -> dict:
+        with self._lock:
+            self._next_id += 1
+            request["id"] = self._next_id
+            for attempt in range(2):
+                try:
+                    if self._sock is None:
+                        self._connect()
+                    self._sock.sendall(json.dumps(request).encode() + b"\n")
+                    line = self._file.readline(MAX_LINE)
+                    if not line:
+                        raise ConnectionError("gateway closed connection")
+                    return json.loads(line)
+                except (OSError, ConnectionError):
+                    self._close()
+                    if attempt:
+                        raise
+
+    def status(self):
+        reply = self._request({"op": "status"})
+        # The gateway never forwards a 914, the fault proxy injects them
+        if reply.get("err") == "914":
+            return dict(ERROR_914)
+        if not reply.get("ok"):
+            raise GatewayError(reply.get("error", "status failed"))
+        return {"dps": reply.get("dps", {})}
+
+    def set_value(self, dp, value):
+        reply = self._request({"op": "set", "dp": dp, "value": value})
+        if reply.get("err") == "914":
+            return dict(ERROR_914)
+        if not reply.get("ok"):
+            raise GatewayError(reply.get("error", "set failed"))
+        return {"dps": {dp: value}}
+
+    def heartbeat(self):
+        return self._request({"op": "ping"})
+
+    def set_socketPersistent(self, persist):
+        pass
+
+    def set_socketNODELAY(self, nodelay):
+        pass
+
+    def set_socketTimeout(self, timeout):
+        self.timeout = timeout
+        if self._sock is not None:
+            self._sock.settimeout(timeout)
@@ -83,13 +83,13 @@ class KlartaHumeaHumidifier(HumidifierEntity):
 
     @property
     def available(self) -> bool:
-        return self._available
+        return self._available and self._device_manager.available
 
     async def async_turn_on(self, **kwargs) -> None:
         try:
             result = await asyncio.wait_for(
                 self._device_manager.set_value(DP_POWER, True),
-                timeout=5.0
+                timeout=self._device_manager.entity_timeout
             )
 
             if result:
@@ -98,20 +98,17 @@ class KlartaHumeaHumidifier(HumidifierEntity):
                 self.async_write_ha_state()
             else:
                 _LOGGER.warning(f"⚠️ Humidifier turn on returned False")
-                self._available = False
 
         except asyncio.TimeoutError:
             _LOGGER.error(f"❌ Humidifier turn on timeout")
-            self._available = False
         except Exception as e:
             _LOGGER.error(f"❌ Humidifier turn on failed: {e}")
-            self._available = False
 
     async def async_turn_off(self, **kwargs) -> None:
         try:
             result = await asyncio.wait_for(
                 self._device_manager.set_value(DP_POWER, False),
-                timeout=5.0
+                timeout=self._device_manager.entity_timeout
             )
 
             if result:
@@ -120,14 +117,11 @@ class KlartaHumeaHumidifier(HumidifierEntity):
                 self.async_write_ha_state()
             else:
                 _LOGGER.warning(f"⚠️ Humidifier turn off returned False")
-                self._available = False
 
         except asyncio.TimeoutError:
             _LOGGER.error(f"❌ Humidifier turn off timeout")
-            self._available = False
         except Exception as e:
             _LOGGER.error(f"❌ Humidifier turn off failed: {e}")
-            self._available = False
 
     async def async_set_humidity(self, humidity: int) -> None:
         humidity = max(MIN_TARGET_HUMIDITY, min(MAX_TARGET_HUMIDITY, humidity))
@@ -136,7 +130,7 @@ class KlartaHumeaHumidifier(HumidifierEntity):
             target_value = f"{humidity}RH"
             result = await asyncio.wait_for(
                 self._device_manager.set_value(DP_TARGET_HUMIDITY, target_value),
-                timeout=5.0
+                timeout=self._device_manager.entity_timeout
             )
 
             if result:
@@ -145,20 +139,17 @@ class KlartaHumeaHumidifier(HumidifierEntity):
                 self.async_write_ha_state()
             else:
                 _LOGGER.warning(f"⚠️ Set humidity returned False")
-                self._available = False
 
         except asyncio.TimeoutError:
             _LOGGER.error(f"❌ Set humidity timeout")
-            self._available = False
         except Exception as e:
             _LOGGER.error(f"❌ Set humidity failed: {e}")
-            self._available = False
 
     async def async_update(self) -> None:
         try:
             data = await asyncio.wait_for(
                 self._device_manager.get_status(),
-                timeout=5.0
+                timeout=self._device_manager.entity_timeout
             )
 
             if not data or "dps" not in data:
@@ -182,7 +173,5 @@ class KlartaHumeaHumidifier(HumidifierEntity):
 
         except asyncio.TimeoutError:
             _LOGGER.error(f"❌ Humidifier update timeout")
-            self._available = False
         except Exception as e:
             _LOGGER.error(f"❌ Humidifier update failed: {e}")
-            self._available = False
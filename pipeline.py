@@ -0,0 +1,183 @@
+"""Request Pipeline - v1.0 - Several requests in flight on one persistent socket
+
+Tuya frames carry a sequence number and the device answers a request
+with the same number. The pipeline sends frames without waiting, a single
+reader thread receives every frame and routes it:
+
+    seqno matches a pending request -> resolve that request's future
+    anything else (status pushes)   -> on_unsolicited(decoded)
+
+The transport does the actual framing: next_seqno(), send(op, args),
+receive() -> (seqno, cmd, decoded) and close(). TinyTuyaTransport adapts
+a tinytuya.Device (frames written straight to its socket, read with
+_receive()). A failed send closes the pipeline and fails every pending
+request - the manager then replaces the connection instead of letting
+tinytuya reconnect (and renegotiate the session key) underneath the reader.
+"""
+
+import logging
+import socket
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, Optional, Tuple
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class PipelineClosed(ConnectionError):
+    """Pipeline was closed while a request was in flight"""
+
+
+class TinyTuyaTransport:
+    """Frame transport on top of tinytuya.Device internals"""
+
+    def __init__(self, device):
+        import tinytuya
+
+        self._device = device
+        self._commands = {
+            "status": tinytuya.DP_QUERY,
+            "set_value": tinytuya.CONTROL,
+            "heartbeat": tinytuya.HEART_BEAT,
+        }
+
+    @staticmethod
+    def supports(device) -> bool:
+        return all(hasattr(device, name) for name in ("generate_payload", "_encode_message", "_receive", "seqno", "socket"))
+
+    def next_seqno(self) -> int:
+        """Sequence number the next send() will carry"""
+        return self._device.seqno
+
+    def send(self, op: str, args: tuple):
+        data = {str(args[0]): args[1]} if op == "set_value" else None
+        sock = self._device.socket
+        if sock is None:
+            raise PipelineClosed("device socket closed")
+        payload = self._device.generate_payload(self._commands[op], data)
+        # Not _send_receive(): on a dropped socket it reconnects and negotiates
+        # a session key, reading the socket the reader thread is blocked on
+        sock.sendall(self._device._encode_message(payload))
+
+    def receive(self) -> Optional[Tuple[int, int, dict]]:
+        """Blocking read of one frame -> (seqno, cmd, decoded) or None on idle timeout"""
+        try:
+            msg = self._device._receive()
+        except socket.timeout:
+            return None
+        if msg is None:
+            return None
+        decoded = {}
+        if msg.payload:
+            decoded = self._device._decode_payload(msg.payload)
+            if not isinstance(decoded, dict):
+                decoded = {"raw": decoded}
+        return msg.seqno, msg.cmd, decoded
+
+    def close(self):
+        if hasattr(self._device, "close"):
+            self._device.close()
+
+
+class RequestPipeline:
+    """Sequence-number matcher with one reader thread per connection"""
+
+    def __init__(self, transport, on_unsolicited: Optional[Callable[[dict], None]] = None):
+        self._transport = transport
+        self._on_unsolicited = on_unsolicited
+        self._pending: Dict[int, Future] = {}
+        self._pending_lock = threading.Lock()
+        self._send_lock = threading.Lock()
+        self._closed = threading.Event()
+        self.in_flight_peak = 0
+        self.unsolicited = 0
+        self.unmatched = 0
+        self._reader = threading.Thread(target=self._read_loop, name="klarta-pipeline-reader", daemon=True)
+        self._reader.start()
+
+    def submit(self, op: str, *args) -> Future:
+        """Send a request and return a Future for its matching response"""
+        if self._closed.is_set():
+            raise PipelineClosed("pipeline closed")
+        future = Future()
+        with self._send_lock:
+            # Register before sending - the reply can beat us back otherwise
+            seqno = self._transport.next_seqno()
+            with self._pending_lock:
+                self._pending[seqno] = future
+                self.in_flight_peak = max(self.in_flight_peak, len(self._pending))
+            try:
+                self._transport.send(op, args)
+            except Exception as e:
+                self._forget(seqno)
+                # Half-written frame or dead socket - nothing on it can be trusted
+                _LOGGER.debug(f"Pipeline send failed, closing: {type(e).__name__}: {e}")
+                self.close()
+                raise PipelineClosed(f"send failed: {e}") from e
+        future.add_done_callback(lambda _f, s=seqno: self._forget(s))
+        return future
+
+    @property
+    def closed(self) -> bool:
+        return self._closed.is_set()
+
+    def request(self, op: str, *args, timeout: float = 10.0):
+        """Blocking submit + wait (for use from worker threads)"""
+        return self.submit(op, *args).result(timeout=timeout)
+
+    def _forget(self, seqno: int):
+        with self._pending_lock:
+            self._pending.pop(seqno, None)
+
+    def _read_loop(self):
+        while not self._closed.is_set():
+            try:
+                frame = self._transport.receive()
+            except Exception as e:
+                if self._closed.is_set():
+                    break
+                _LOGGER.debug(f"Pipeline reader error: {type(e).__name__}: {e}")
+                self._fail_all(e)
+                time.sleep(0.1)
+                continue
+            if frame is None:
+                continue
+
+            seqno, cmd, decoded = frame
+            with self._pending_lock:
+                future = self._pending.pop(seqno, None)
+            if future is not None:
+                if not future.done():
+                    future.set_result(decoded)
+                continue
+
+            if decoded:
+                self.unsolicited += 1
+                if self._on_unsolicited is not None:
+                    try:
+                        self._on_unsolicited(decoded)
+                    except Exception as e:
+                        _LOGGER.error(f"❌ Unsolicited frame handler failed: {e}")
+            else:
+                self.unmatched += 1
+                _LOGGER.debug(f"📭 Unmatched empty frame seq={seqno} cmd={cmd}")
+
+    def _fail_all(self, error: BaseException):
+        with self._pending_lock:
+            pending, self._pending = self._pending, {}
+        for future in pending.values():
+            if not future.done():
+                future.set_exception(error)
+
+    def close(self):
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        self._fail_all(PipelineClosed("pipeline closed"))
+        try:
+            self._transport.close()
+        except Exception:
+            pass
+        if self._reader is not threading.current_thread():
+            self._reader.join(timeout=2.0)
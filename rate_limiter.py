@@ -0,0 +1,73 @@
+"""Rate Limiter - v1.0 - Per-device token bucket for outbound frames
+
+Every frame the manager sends (status, updatedps, set_value, heartbeat)
+takes one token. Tokens refill at `rate` per second up to `burst`. When
+the bucket is empty a caller is not rejected: reserve() books the next
+free slot and returns how long to wait for it, so callers queue in
+arrival order. Thread-safe and loop-agnostic - async callers sleep on
+their own loop, worker threads sleep in place.
+"""
+
+import asyncio
+import threading
+import time
+
+
+class TokenBucket:
+    """Reservation-style token bucket - tokens go negative while callers queue"""
+
+    def __init__(self, rate: float, burst: float = 1.0):
+        self._lock = threading.Lock()
+        self.rate = float(rate)
+        self.burst = max(1.0, float(burst))
+        self._tokens = self.burst
+        self._stamp = time.monotonic()
+
+    def configure(self, rate: float, burst: float):
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = float(rate)
+            self.burst = max(1.0, float(burst))
+            self._tokens = min(self._tokens, self.burst)
+
+    def _refill(self, now: float):
+        if self._tokens < self.burst:
+            self._tokens = min(self.burst, self._tokens + (now - self._stamp) * self.rate)
+        self._stamp = now
+
+    def reserve(self) -> float:
+        """Take a token, return seconds until it may be used (0 = send now)"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def refund(self):
+        """Give back a reserved token that was never used (caller gave up)"""
+        with self._lock:
+            self._tokens = min(self.burst, self._tokens + 1)
+
+    @property
+    def queued(self) -> int:
+        """Callers currently waiting for a slot"""
+        with self._lock:
+            self._refill(time.monotonic())
+            return max(0, int(-self._tokens + 0.999))
+
+    async def acquire(self) -> float:
+        delay = self.reserve()
+        if delay:
+            try:
+                await asyncio.sleep(delay)
+            except asyncio.CancelledError:
+                self.refund()
+                raise
+        return delay
+
+    def acquire_sync(self) -> float:
+        delay = self.reserve()
+        if delay:
+            time.sleep(delay)
+        return delay
@@ -71,7 +71,7 @@ class KlartaHueaFanSpeed(SelectEntity):
 
     @property
     def available(self) -> bool:
-        return self._available
+        return self._available and self._device_manager.available
 
     async def async_select_option(self, option: str) -> None:
         if option not in FAN_SPEED_OPTIONS:
@@ -81,7 +81,7 @@ class KlartaHueaFanSpeed(SelectEntity):
         try:
             result = await asyncio.wait_for(
                 self._device_manager.set_value(self._dp, option),
-                timeout=5.0
+                timeout=self._device_manager.entity_timeout
             )
 
             if result:
@@ -91,20 +91,17 @@ class KlartaHueaFanSpeed(SelectEntity):
                 _LOGGER.info(f"✅ Fan speed set to {option}")
             else:
                 _LOGGER.warning(f"⚠️ Fan speed set_value returned False")
-                self._available = False
 
         except asyncio.TimeoutError:
             _LOGGER.error(f"❌ Fan speed set timeout")
-            self._available = False
         except Exception as e:
             _LOGGER.error(f"❌ Fan speed set failed: {e}")
-            self._available = False
 
     async def async_update(self) -> None:
         try:
             data = await asyncio.wait_for(
                 self._device_manager.get_status(),
-                timeout=5.0
+                timeout=self._device_manager.entity_timeout
             )
 
             if not data or "dps" not in data:
@@ -126,7 +123,5 @@ class KlartaHueaFanSpeed(SelectEntity):
 
         except asyncio.TimeoutError:
             _LOGGER.error(f"❌ Fan Speed update timeout")
-            self._available = False
         except Exception as e:
             _LOGGER.error(f"❌ Fan Speed update failed: {e}")
-            self._available = False
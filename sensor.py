@@ -2,13 +2,22 @@
 
 import logging
 import asyncio
+import time
 from typing import Optional
 
 from homeassistant.components.sensor import SensorEntity, SensorDeviceClass, SensorStateClass
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
+from .const import (
+    DEFAULT_HUMIDITY_DEADBAND,
+    DEFAULT_MAX_REPORT_AGE,
+    DEFAULT_MIN_REPORT_INTERVAL,
+    DEFAULT_TEMPERATURE_DEADBAND,
+)
+
 _LOGGER = logging.getLogger(__name__)
 
 DOMAIN = "klarta_humea"
@@ -17,6 +26,8 @@ DP_CURRENT_HUMIDITY = "14"
 DP_TEMPERATURE = "10"
 DP_WATER_LEVEL = "102"
 
+SIGNAL_OPTIONS_UPDATED = "klarta_humea_options_updated_{}"
+
 
 async def async_setup_entry(
     hass: HomeAssistant,
@@ -36,10 +47,12 @@ async def async_setup_entry(
 
     _LOGGER.info(f"Sensor setup for {data['device_id']}")
     name = data["name"]
+    options = config_entry.options
+    signal = SIGNAL_OPTIONS_UPDATED.format(config_entry.entry_id)
 
     async_add_entities([
-        HumiditySensor(device_manager, f"{name} Current Humidity"),
-        TemperatureSensor(device_manager, f"{name} Temperature"),
+        HumiditySensor(device_manager, f"{name} Current Humidity", options, signal),
+        TemperatureSensor(device_manager, f"{name} Temperature", options, signal),
         WaterLevelSensor(device_manager, f"{name} Water Level"),
     ])
 
@@ -70,13 +83,13 @@ class BaseKlartaSensor(SensorEntity):
 
     @property
     def available(self) -> bool:
-        return self._available
+        return self._available and self._device_manager.available
 
     async def async_update(self) -> None:
         try:
             data = await asyncio.wait_for(
                 self._device_manager.get_status(),
-                timeout=5.0
+                timeout=self._device_manager.entity_timeout
             )
 
             if not data or "dps" not in data:
@@ -93,25 +106,88 @@ class BaseKlartaSensor(SensorEntity):
 
         except asyncio.TimeoutError:
             _LOGGER.error(f"❌ {self._name} update timeout")
-            self._available = False
         except Exception as e:
             _LOGGER.error(f"❌ {self._name} update failed: {e}")
-            self._available = False
 
     def _process_value(self, value):
         """Process raw value - override in subclasses."""
         return value
 
 
-class HumiditySensor(BaseKlartaSensor):
+class FilteredKlartaSensor(BaseKlartaSensor):
+    """Numeric sensor with deadband and min-interval reporting
+
+    A new value is published only when it differs from the last published
+    value by at least `deadband` and `min_interval` seconds have passed.
+    After `max_age` seconds the current value is published regardless.
+    Thresholds come from the entry options and follow live option changes.
+    """
+
+    _deadband_key = None
+    _default_deadband = 0.0
+
+    def __init__(self, device_manager, name: str, dp: str, options: dict, options_signal: str):
+        super().__init__(device_manager, name, dp)
+        self._options_signal = options_signal
+        self._last_report_time = 0.0
+        self._suppressed = 0
+        self._set_filters(options)
+
+    def _set_filters(self, options: dict) -> None:
+        self._deadband = float(options.get(self._deadband_key, self._default_deadband))
+        self._min_interval = float(options.get("min_report_interval", DEFAULT_MIN_REPORT_INTERVAL))
+        self._max_age = float(options.get("max_report_age", DEFAULT_MAX_REPORT_AGE))
+
+    async def async_added_to_hass(self) -> None:
+        self.async_on_remove(
+            async_dispatcher_connect(self.hass, self._options_signal, self._async_options_updated)
+        )
+
+    @callback
+    def _async_options_updated(self, options: dict) -> None:
+        self._set_filters(options)
+
+    def _should_report(self, previous, value, now: float) -> bool:
+        if value is None or previous is None:
+            return True
+        elapsed = now - self._last_report_time
+        if self._max_age and elapsed >= self._max_age:
+            return True
+        if elapsed < self._min_interval:
+            return False
+        return abs(value - previous) >= self._deadband
+
+    async def async_update(self) -> None:
+        previous = self._native_value
+        await super().async_update()
+
+        value = self._native_value
+        if value is previous:
+            return
+
+        now = time.monotonic()
+        if self._should_report(previous, value, now):
+            self._last_report_time = now
+            return
+
+        # Hold the published value - change is within deadband or too soon
+        self._native_value = previous
+        self._suppressed += 1
+        _LOGGER.debug(f"🔇 {self._name} held {previous} (polled {value}, {self._suppressed} suppressed)")
+
+
+class HumiditySensor(FilteredKlartaSensor):
     """Humidity sensor."""
 
     _attr_device_class = SensorDeviceClass.HUMIDITY
     _attr_state_class = SensorStateClass.MEASUREMENT
     _attr_native_unit_of_measurement = "%"
 
-    def __init__(self, device_manager, name: str):
-        super().__init__(device_manager, name, DP_CURRENT_HUMIDITY)
+    _deadband_key = "humidity_deadband"
+    _default_deadband = DEFAULT_HUMIDITY_DEADBAND
+
+    def __init__(self, device_manager, name: str, options: dict, options_signal: str):
+        super().__init__(device_manager, name, DP_CURRENT_HUMIDITY, options, options_signal)
 
     def _process_value(self, value):
         try:
@@ -120,15 +196,18 @@ class HumiditySensor(BaseKlartaSensor):
             return None
 
 
-class TemperatureSensor(BaseKlartaSensor):
+class TemperatureSensor(FilteredKlartaSensor):
     """Temperature sensor."""
 
     _attr_device_class = SensorDeviceClass.TEMPERATURE
     _attr_state_class = SensorStateClass.MEASUREMENT
     _attr_native_unit_of_measurement = "°C"
 
-    def __init__(self, device_manager, name: str):
-        super().__init__(device_manager, name, DP_TEMPERATURE)
+    _deadband_key = "temperature_deadband"
+    _default_deadband = DEFAULT_TEMPERATURE_DEADBAND
+
+    def __init__(self, device_manager, name: str, options: dict, options_signal: str):
+        super().__init__(device_manager, name, DP_TEMPERATURE, options, options_signal)
 
     def _process_value(self, value):
         try:
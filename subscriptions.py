@@ -0,0 +1,90 @@
+"""Subscriptions - v1.0 - Bounded per-subscriber queues behind manager.watch()
+
+The manager offers every new snapshot to each subscription. offer() never
+blocks and never runs consumer code: it hands the snapshot to the
+subscriber's own event loop, where it is filtered, diffed and queued.
+When a consumer falls behind its queue stays bounded:
+
+    drop_oldest      the oldest queued update is discarded
+    coalesce_latest  the newest update is merged into the last queued one
+                     (deltas are combined, snapshots replaced), so the
+                     consumer skips intermediate states but never the latest
+"""
+
+import asyncio
+from collections import deque
+from typing import Callable, Iterable, Optional
+
+OVERFLOW_POLICIES = ("drop_oldest", "coalesce_latest")
+
+_MISSING = object()
+
+
+class Subscription:
+    """One watch() consumer - lives on the loop it was created on"""
+
+    def __init__(self, dps: Optional[Iterable] = None, deltas: bool = False, changes_only: bool = True,
+                 maxsize: int = 16, overflow: str = "drop_oldest", on_drop: Optional[Callable] = None):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"overflow must be one of {OVERFLOW_POLICIES}")
+        self.loop = asyncio.get_running_loop()
+        self.dps = {str(dp) for dp in dps} if dps else None
+        self.deltas = deltas
+        self.changes_only = changes_only
+        self.maxsize = max(1, maxsize)
+        self.overflow = overflow
+        self.dropped = 0
+        self.delivered = 0
+        self._on_drop = on_drop
+        self._queue = deque()
+        self._ready = asyncio.Event()
+        self._last = {}
+
+    def offer(self, dps: dict):
+        """New device state - callable from any thread or loop"""
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self.loop:
+            self._push(dps)
+            return
+        try:
+            self.loop.call_soon_threadsafe(self._push, dps)
+        except RuntimeError:
+            # Subscriber's loop is closed - it is going away anyway
+            pass
+
+    def _push(self, dps: dict):
+        view = dps if self.dps is None else {dp: v for dp, v in dps.items() if dp in self.dps}
+        if self.deltas:
+            item = {dp: v for dp, v in view.items() if self._last.get(dp, _MISSING) != v}
+            if not item:
+                return
+            self._last = {**self._last, **view}
+        else:
+            if self.changes_only and view == self._last:
+                return
+            item = self._last = dict(view)
+
+        if len(self._queue) >= self.maxsize:
+            self.dropped += 1
+            if self._on_drop is not None:
+                self._on_drop()
+            if self.overflow == "coalesce_latest":
+                self._queue[-1] = {**self._queue[-1], **item} if self.deltas else item
+                return
+            self._queue.popleft()
+        self._queue.append(item)
+        self._ready.set()
+
+    @property
+    def pending(self) -> int:
+        return len(self._queue)
+
+    async def get(self) -> dict:
+        while not self._queue:
+            self._ready.clear()
+            await self._ready.wait()
+        self.delivered += 1
+        return {"dps": self._queue.popleft()}
@@ -94,7 +94,7 @@ class KlartaHueaBaseSwitch(SwitchEntity):
 
     def available(self) -> bool:
 
-        return self._available
+        return self._available and self._device_manager.available
 
     async def async_turn_on(self, **kwargs: Any) -> None:
 
@@ -104,7 +104,7 @@ class KlartaHueaBaseSwitch(SwitchEntity):
 
                 self._device_manager.set_value(self._dp, True),
 
-                timeout=5.0
+                timeout=self._device_manager.entity_timeout
 
             )
 
@@ -120,20 +120,14 @@ class KlartaHueaBaseSwitch(SwitchEntity):
 
                 _LOGGER.warning(f"⚠️ {self._name} set_value returned False")
 
-                self._available = False
-
         except asyncio.TimeoutError:
 
             _LOGGER.error(f"❌ {self._name} turn on timeout")
 
-            self._available = False
-
         except Exception as e:
 
             _LOGGER.error(f"❌ {self._name} turn on failed: {e}")
 
-            self._available = False
-
     async def async_turn_off(self, **kwargs: Any) -> None:
 
         try:
@@ -142,7 +136,7 @@ class KlartaHueaBaseSwitch(SwitchEntity):
 
                 self._device_manager.set_value(self._dp, False),
 
-                timeout=5.0
+                timeout=self._device_manager.entity_timeout
 
             )
 
@@ -158,20 +152,14 @@ class KlartaHueaBaseSwitch(SwitchEntity):
 
                 _LOGGER.warning(f"⚠️ {self._name} set_value returned False")
 
-                self._available = False
-
         except asyncio.TimeoutError:
 
             _LOGGER.error(f"❌ {self._name} turn off timeout")
 
-            self._available = False
-
         except Exception as e:
 
             _LOGGER.error(f"❌ {self._name} turn off failed: {e}")
 
-            self._available = False
-
     async def async_update(self) -> None:
 
         try:
@@ -180,7 +168,7 @@ class KlartaHueaBaseSwitch(SwitchEntity):
 
                 self._device_manager.get_status(),
 
-                timeout=5.0
+                timeout=self._device_manager.entity_timeout
 
             )
 
@@ -208,14 +196,10 @@ class KlartaHueaBaseSwitch(SwitchEntity):
 
             _LOGGER.error(f"❌ {self._name} update timeout")
 
-            self._available = False
-
         except Exception as e:
 
             _LOGGER.error(f"❌ {self._name} update failed: {e}")
 
-            self._available = False
-
 
 class KlartaHumeaPowerSwitch(KlartaHueaBaseSwitch):
 
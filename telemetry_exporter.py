@@ -0,0 +1,210 @@
+"""Telemetry Exporter - v1.0 - Batched time-series export of device snapshots
+
+Managers hand every fresh snapshot to observe(), which only stores it.
+A background task samples the latest snapshot of each device every
+sample_interval seconds into a bounded in-memory buffer, and flushes the
+buffer in batches from a worker thread to rotating CSV files:
+
+    klarta_telemetry.csv                   current file
+    klarta_telemetry.20261019T120000.csv.gz  rotated, gzip-compressed
+
+    t,device,humidity,temperature,water,fan,power
+    1760875200,bf1234,48,21,Water_enough,Low_speed,1
+
+When the disk is slower than the sampler the buffer fills and the drop
+policy decides which samples go ("oldest" or "newest"); polling and the
+event loop never wait for the disk.
+"""
+
+import asyncio
+import csv
+import gzip
+import io
+import logging
+import os
+import shutil
+import time
+from collections import deque
+from typing import Dict, Optional
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_SAMPLE_INTERVAL = 60.0
+DEFAULT_FLUSH_INTERVAL = 300.0
+DEFAULT_MAX_BUFFER = 10000
+DEFAULT_ROTATE_BYTES = 5 * 1024 * 1024
+DEFAULT_KEEP_FILES = 30
+
+FILE_NAME = "klarta_telemetry.csv"
+COLUMNS = ("t", "device", "humidity", "temperature", "water", "fan", "power")
+
+# column -> DP
+TELEMETRY_DPS = {
+    "humidity": "14",
+    "temperature": "10",
+    "water": "102",
+    "fan": "103",
+    "power": "1",
+}
+
+DROP_POLICIES = ("oldest", "newest")
+
+
+class TelemetryExporter:
+    """One exporter per directory, shared by all managers writing to it"""
+
+    _instances: Dict[str, 'TelemetryExporter'] = {}
+
+    @classmethod
+    def shared(cls, directory: str, **kwargs) -> 'TelemetryExporter':
+        """Exporter for directory - settings of the first caller win"""
+        directory = os.path.abspath(directory)
+        if directory not in cls._instances:
+            cls._instances[directory] = cls(directory, **kwargs)
+        return cls._instances[directory]
+
+    def __init__(self, directory: str, sample_interval: float = DEFAULT_SAMPLE_INTERVAL,
+                 flush_interval: float = DEFAULT_FLUSH_INTERVAL, max_buffer: int = DEFAULT_MAX_BUFFER,
+                 drop_policy: str = "oldest", rotate_bytes: int = DEFAULT_ROTATE_BYTES,
+                 keep_files: int = DEFAULT_KEEP_FILES):
+        if drop_policy not in DROP_POLICIES:
+            raise ValueError(f"drop_policy must be one of {DROP_POLICIES}")
+        self.directory = directory
+        self.sample_interval = sample_interval
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self.drop_policy = drop_policy
+        self.rotate_bytes = rotate_bytes
+        self.keep_files = keep_files
+
+        self._latest = {}
+        self._devices = set()
+        self._buffer = deque(maxlen=max_buffer if drop_policy == "oldest" else None)
+        self._task: Optional[asyncio.Task] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        self._last_flush = time.monotonic()
+
+        self.stats = dict.fromkeys(("samples", "dropped", "rows_written", "flushes", "flush_errors",
+                                    "rotations"), 0)
+        self.stats["last_flush_s"] = 0.0
+
+    @property
+    def path(self) -> str:
+        return os.path.join(self.directory, FILE_NAME)
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    async def add_device(self, device_id: str):
+        self._devices.add(device_id)
+        if self._task is None:
+            await asyncio.to_thread(os.makedirs, self.directory, exist_ok=True)
+            self._last_flush = time.monotonic()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+            _LOGGER.info(f"📊 Telemetry export to {self.directory} every {self.sample_interval:.0f}s")
+
+    async def remove_device(self, device_id: str):
+        """Stop feeding device_id - the last one out stops the exporter"""
+        self._devices.discard(device_id)
+        self._latest.pop(device_id, None)
+        if not self._devices:
+            await self.stop()
+
+    async def stop(self):
+        """Stop sampling and write out whatever is buffered"""
+        if self._task is None:
+            return
+        task, self._task = self._task, None
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        if self._flush_task is not None:
+            await asyncio.gather(self._flush_task, return_exceptions=True)
+        await self._flush()
+        self._instances.pop(self.directory, None)
+        _LOGGER.info(f"📊 Telemetry export stopped ({self.stats['rows_written']} rows, "
+                     f"{self.stats['dropped']} dropped)")
+
+    def observe(self, device_id: str, dps: dict):
+        """Latest snapshot of a device - called from the manager, never blocks"""
+        if device_id in self._devices:
+            self._latest[device_id] = (time.time(), dps)
+
+    def _sample(self, now: float):
+        max_age = 2 * self.sample_interval
+        stamp = int(now)
+        for device_id, (seen, dps) in self._latest.items():
+            if now - seen > max_age:
+                # No fresh data - leave a gap rather than repeat a stale value
+                continue
+            row = (stamp, device_id, *(dps.get(dp) for dp in TELEMETRY_DPS.values()))
+            if self.drop_policy == "newest" and len(self._buffer) >= self.max_buffer:
+                self.stats["dropped"] += 1
+                continue
+            if len(self._buffer) == self._buffer.maxlen:
+                self.stats["dropped"] += 1
+            self._buffer.append(row)
+            self.stats["samples"] += 1
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.sample_interval)
+            self._sample(time.time())
+            flush_due = time.monotonic() - self._last_flush >= self.flush_interval
+            if flush_due and (self._flush_task is None or self._flush_task.done()):
+                # A slow disk only delays the flush - sampling carries on into the buffer
+                self._flush_task = asyncio.get_running_loop().create_task(self._flush())
+
+    async def _flush(self):
+        if not self._buffer:
+            return
+        rows = list(self._buffer)
+        self._buffer.clear()
+        self._last_flush = time.monotonic()
+        started = time.monotonic()
+        try:
+            await asyncio.to_thread(self._write_rows, rows)
+        except Exception as e:
+            self.stats["flush_errors"] += 1
+            self.stats["dropped"] += len(rows)
+            _LOGGER.error(f"❌ Telemetry flush failed, {len(rows)} samples lost: {e}")
+            return
+        self.stats["flushes"] += 1
+        self.stats["rows_written"] += len(rows)
+        self.stats["last_flush_s"] = round(time.monotonic() - started, 3)
+        _LOGGER.debug(f"📊 Flushed {len(rows)} samples in {self.stats['last_flush_s']}s")
+
+    def _write_rows(self, rows):
+        """Append one batch (worker thread), rotating first when the file is full"""
+        path = self.path
+        if os.path.exists(path) and os.path.getsize(path) >= self.rotate_bytes:
+            self._rotate(path)
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        if not os.path.exists(path):
+            writer.writerow(COLUMNS)
+        writer.writerows(_compact(row) for row in rows)
+        with open(path, "a", encoding="utf-8", newline="") as f:
+            f.write(buffer.getvalue())
+
+    def _rotate(self, path: str):
+        stamp = time.strftime("%Y%m%dT%H%M%S", time.gmtime())
+        target = os.path.join(self.directory, f"klarta_telemetry.{stamp}.csv.gz")
+        suffix = 1
+        while os.path.exists(target):
+            target = os.path.join(self.directory, f"klarta_telemetry.{stamp}-{suffix}.csv.gz")
+            suffix += 1
+        with open(path, "rb") as src, gzip.open(target, "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        os.remove(path)
+        self.stats["rotations"] += 1
+
+        rotated = sorted(f for f in os.listdir(self.directory)
+                         if f.startswith("klarta_telemetry.") and f.endswith(".csv.gz"))
+        for old in rotated[:-self.keep_files] if self.keep_files else []:
+            os.remove(os.path.join(self.directory, old))
+
+
+def _compact(row):
+    """Booleans as 0/1, missing values as empty cells"""
+    return ["" if v is None else int(v) if isinstance(v, bool) else v for v in row]
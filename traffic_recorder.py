@@ -0,0 +1,189 @@
+"""Traffic Recorder - v1.0 - Record and replay raw device traffic"""
+
+import gzip
+import json
+import logging
+import socket
+import threading
+import time
+from typing import Optional
+
+_LOGGER = logging.getLogger(__name__)
+
+# Operations proxied between the manager and the tinytuya device
+# (updatedps/receive: selective refresh of the volatile DPs)
+RECORDED_OPS = ("status", "set_value", "heartbeat", "updatedps", "receive")
+OPTIONAL_OPS = ("updatedps", "receive")
+
+
+def _open_trace(path: str, mode: str):
+    """Open a trace file, gzip-compressed when the name ends in .gz"""
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+class TrafficRecorder:
+    """Write timestamped raw device responses and errors as JSON lines
+
+    One line per call:
+        {"t": 12.345, "op": "status", "d": 0.213, "r": {...}}
+        {"t": 13.001, "op": "set_value", "a": ["101", "55RH"], "d": 10.0, "e": ["timeout", "timed out"]}
+
+    t = seconds since recording started, d = call duration,
+    r = raw response, e = [error type, message]
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = _open_trace(path, "w")
+        self._lock = threading.Lock()
+        self._start = time.monotonic()
+        self.count = 0
+        _LOGGER.info(f"🎙️ Recording device traffic to {path}")
+
+    def record(self, op: str, args, started: float, duration: float, response=None, error: Optional[BaseException] = None):
+        entry = {"t": round(started - self._start, 4), "op": op, "d": round(duration, 4)}
+        if args:
+            entry["a"] = list(args)
+        if error is not None:
+            kind = "timeout" if isinstance(error, (socket.timeout, TimeoutError)) else type(error).__name__
+            entry["e"] = [kind, str(error)]
+        else:
+            entry["r"] = response
+
+        line = json.dumps(entry, separators=(",", ":"), default=str)
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write(line + "\n")
+            self.count += 1
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+        _LOGGER.info(f"🎙️ Recording stopped - {self.count} calls written to {self.path}")
+
+
+class RecordingDevice:
+    """Proxy around a tinytuya.Device that records every call"""
+
+    def __init__(self, device, recorder: TrafficRecorder):
+        self._device = device
+        self._recorder = recorder
+
+    def _call(self, op: str, *args):
+        started = time.monotonic()
+        try:
+            response = getattr(self._device, op)(*args)
+        except Exception as e:
+            self._recorder.record(op, args, started, time.monotonic() - started, error=e)
+            raise
+        self._recorder.record(op, args, started, time.monotonic() - started, response=response)
+        return response
+
+    def status(self):
+        return self._call("status")
+
+    def set_value(self, dp, value):
+        return self._call("set_value", dp, value)
+
+    def heartbeat(self):
+        return self._call("heartbeat")
+
+    def __getattr__(self, name):
+        attr = getattr(self._device, name)
+        if name in OPTIONAL_OPS:
+            # Recorded too, but only offered when the device has them
+            return lambda *args: self._call(name, *args)
+        return attr
+
+
+class ReplayedError(Exception):
+    """Exception replayed from a trace (original type not reconstructible)"""
+
+
+class ReplayDevice:
+    """Stand-in for tinytuya.Device that plays back a recorded trace
+
+    Each call consumes the next recorded entry for the same operation,
+    sleeps for the recorded duration divided by `speed` and then returns
+    the recorded response or raises the recorded error. speed=0 disables
+    sleeping entirely. When a trace runs out it either loops or raises.
+    """
+
+    def __init__(self, path: str, speed: float = 1.0, loop: bool = True):
+        self.path = path
+        self.speed = speed
+        self.loop = loop
+        self._entries = {op: [] for op in RECORDED_OPS}
+        with _open_trace(path, "r") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                entry = json.loads(line)
+                self._entries.setdefault(entry["op"], []).append(entry)
+        self._positions = {op: 0 for op in self._entries}
+        self._lock = threading.Lock()
+        self.calls = 0
+        _LOGGER.info(
+            f"▶️ Replaying {sum(len(v) for v in self._entries.values())} calls from {path} at {speed}x"
+        )
+
+    @classmethod
+    def factory(cls, path: str, speed: float = 1.0, loop: bool = True):
+        """Device factory for PersistentDeviceManager.set_device_factory()"""
+        return lambda: cls(path, speed=speed, loop=loop)
+
+    def _next(self, op: str) -> Optional[dict]:
+        with self._lock:
+            entries = self._entries.get(op) or []
+            if not entries:
+                return None
+            pos = self._positions[op]
+            if pos >= len(entries):
+                if not self.loop:
+                    raise EOFError(f"Trace exhausted for {op}")
+                pos = 0
+            self._positions[op] = pos + 1
+            self.calls += 1
+            return entries[pos]
+
+    def _play(self, op: str):
+        entry = self._next(op)
+        if entry is None:
+            # Nothing recorded for this op (e.g. heartbeat) - answer instantly
+            return None
+        if self.speed > 0:
+            time.sleep(entry.get("d", 0) / self.speed)
+        if "e" in entry:
+            kind, message = entry["e"]
+            if kind == "timeout":
+                raise socket.timeout(message)
+            raise ReplayedError(f"{kind}: {message}")
+        return entry.get("r")
+
+    def status(self):
+        return self._play("status")
+
+    def set_value(self, dp, value):
+        return self._play("set_value")
+
+    def heartbeat(self):
+        return self._play("heartbeat")
+
+    def __getattr__(self, name):
+        # updatedps()/receive() exist only when the trace has them, so the
+        # manager falls back to full status polls for older traces
+        if name in OPTIONAL_OPS and self.__dict__.get("_entries", {}).get(name):
+            return lambda *args: self._play(name)
+        raise AttributeError(name)
+
+    def set_socketPersistent(self, persist):
+        pass
+
+    def set_socketNODELAY(self, nodelay):
+        pass
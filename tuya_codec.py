@@ -0,0 +1,305 @@
+"""Tuya Frame Codec - v1.0 - Zero-copy framing for protocols 3.3 / 3.4 / 3.5
+
+Frame layouts (all integers big-endian):
+
+    3.3 / 3.4   000055AA seqno cmd length [retcode] payload crc32|hmac 0000AA55
+                length = [4] + payload + 4|32 + 4
+    3.5         00006699 0000 seqno cmd length iv(12) ciphertext tag(16) 00009966
+                length = 12 + ciphertext + 16, AAD = header bytes 4..18
+
+The decoder parses into one preallocated bytearray. Socket data can be read
+straight into it (recv_into on recv_buffer()), several frames per read and
+frames split across reads are handled, and every header is read with
+struct.unpack_from. Payloads are memoryview slices of the buffer - valid
+until the next recv_buffer()/feed(); call bytes() on them to keep them.
+
+CRC32 (3.3) and HMAC-SHA256 (3.4) are verified in place. 3.5 needs the
+optional `cryptography` package for AES-GCM; without a key the ciphertext
+view is returned undecrypted. Payload encryption for 3.3/3.4 (AES-ECB) is
+the caller's business - this module only does framing and integrity.
+"""
+
+import hashlib
+import hmac
+import os
+import struct
+import zlib
+from typing import Iterator, Optional
+
+PREFIX_55AA = 0x000055AA
+SUFFIX_55AA = 0x0000AA55
+PREFIX_6699 = 0x00006699
+SUFFIX_6699 = 0x00009966
+
+PREFIX_55AA_BYTES = PREFIX_55AA.to_bytes(4, "big")
+PREFIX_6699_BYTES = PREFIX_6699.to_bytes(4, "big")
+
+HEADER_55AA = struct.Struct(">IIII")     # prefix, seqno, cmd, length
+HEADER_6699 = struct.Struct(">IHIII")    # prefix, reserved, seqno, cmd, length
+UINT32 = struct.Struct(">I")
+
+GCM_IV_SIZE = 12
+GCM_TAG_SIZE = 16
+HMAC_SIZE = 32
+CRC_SIZE = 4
+
+DEFAULT_BUFFER_SIZE = 4096
+DEFAULT_MAX_FRAME = 64 * 1024
+
+
+class FrameError(ValueError):
+    """Malformed or unverifiable frame"""
+
+
+def _aesgcm(key: bytes):
+    try:
+        from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+    except ImportError as e:
+        raise FrameError("protocol 3.5 needs the 'cryptography' package") from e
+    return AESGCM(bytes(key))
+
+
+class TuyaFrame:
+    """One decoded frame - payload is a view into the decoder buffer (3.3/3.4)"""
+
+    __slots__ = ("seqno", "cmd", "retcode", "payload", "verified")
+
+    def __init__(self, seqno: int, cmd: int, retcode: Optional[int], payload, verified: Optional[bool]):
+        self.seqno = seqno
+        self.cmd = cmd
+        self.retcode = retcode
+        self.payload = payload
+        self.verified = verified
+
+    def __repr__(self):
+        return (f"TuyaFrame(seqno={self.seqno}, cmd={self.cmd}, retcode={self.retcode}, "
+                f"payload={len(self.payload)}B, verified={self.verified})")
+
+
+class FrameDecoder:
+    """Incremental decoder over a preallocated, growable buffer"""
+
+    def __init__(self, version: float = 3.4, key: Optional[bytes] = None, has_retcode: bool = True,
+                 buffer_size: int = DEFAULT_BUFFER_SIZE, max_frame: int = DEFAULT_MAX_FRAME):
+        self.version = float(version)
+        self.key = key
+        self.has_retcode = has_retcode
+        self.max_frame = max_frame
+        self._buf = bytearray(buffer_size)
+        self._view = memoryview(self._buf)
+        self._start = 0
+        self._end = 0
+        self._aead = _aesgcm(key) if self.version >= 3.5 and key else None
+        self._check_size = HMAC_SIZE if self.version >= 3.4 else CRC_SIZE
+        # Keyed HMAC state is built once and copied per frame (skips the key schedule)
+        self._hmac = hmac.new(key, digestmod=hashlib.sha256) if key and self.version >= 3.4 else None
+        self.frames_decoded = 0
+        self.bytes_skipped = 0
+
+    @property
+    def pending(self) -> int:
+        """Bytes buffered but not yet decoded (partial frame)"""
+        return self._end - self._start
+
+    def _make_room(self, size: int):
+        """Move the partial tail to the front, or into a bigger buffer"""
+        pending = self._end - self._start
+        if len(self._buf) - pending >= size:
+            if self._start and pending:
+                # Only the partial frame is copied (regions may overlap, so not via the view)
+                self._buf[0:pending] = self._buf[self._start:self._end]
+        else:
+            # Never resize in place - frame views handed out earlier still export the old buffer
+            grown = bytearray(max(pending + size, 2 * len(self._buf)))
+            grown[0:pending] = self._view[self._start:self._end]
+            self._buf = grown
+            self._view = memoryview(grown)
+        self._start, self._end = 0, pending
+
+    def recv_buffer(self, size: int = 1024) -> memoryview:
+        """Writable tail of the buffer for sock.recv_into() - follow with commit(n)"""
+        if len(self._buf) - self._end < size:
+            self._make_room(size)
+        return self._view[self._end:]
+
+    def commit(self, nbytes: int):
+        self._end += nbytes
+
+    def feed(self, data):
+        """Copy data into the buffer (for callers that already hold bytes)"""
+        size = len(data)
+        view = self.recv_buffer(size)
+        view[:size] = data
+        self.commit(size)
+
+    def _resync(self) -> bool:
+        """Skip garbage up to the next frame prefix"""
+        find = self._buf.find
+        positions = [p for p in (find(PREFIX_55AA_BYTES, self._start + 1, self._end),
+                                 find(PREFIX_6699_BYTES, self._start + 1, self._end)) if p >= 0]
+        target = min(positions) if positions else max(self._start, self._end - 3)
+        self.bytes_skipped += target - self._start
+        self._start = target
+        return bool(positions)
+
+    def frames(self) -> Iterator[TuyaFrame]:
+        """Yield every complete frame in the buffer"""
+        unpack_prefix = UINT32.unpack_from
+        while self._end - self._start >= HEADER_55AA.size:
+            prefix = unpack_prefix(self._buf, self._start)[0]
+            if prefix == PREFIX_55AA:
+                frame = self._decode_55aa()
+            elif prefix == PREFIX_6699:
+                frame = self._decode_6699()
+            elif self._resync():
+                continue
+            else:
+                return
+            if frame is None:
+                return
+            if frame is not False:
+                self.frames_decoded += 1
+                yield frame
+
+    def _check_length(self, length: int) -> bool:
+        if length > self.max_frame:
+            self._resync()
+            return False
+        return True
+
+    def _decode_55aa(self):
+        start = self._start
+        _, seqno, cmd, length = HEADER_55AA.unpack_from(self._buf, start)
+        if not self._check_length(length):
+            return False
+        total = HEADER_55AA.size + length
+        if self._end - start < total:
+            return None
+
+        end = start + total
+        check_size = self._check_size
+        if length < check_size + 4 or UINT32.unpack_from(self._buf, end - 4)[0] != SUFFIX_55AA:
+            self._resync()
+            return False
+
+        body_end = end - 4 - check_size
+        view = self._view
+        if check_size == CRC_SIZE:
+            verified = (zlib.crc32(view[start:body_end]) & 0xFFFFFFFF) == UINT32.unpack_from(self._buf, body_end)[0]
+        elif self._hmac is not None:
+            mac = self._hmac.copy()
+            mac.update(view[start:body_end])
+            verified = hmac.compare_digest(mac.digest(), view[body_end:end - 4])
+        else:
+            verified = None
+
+        payload_start = start + HEADER_55AA.size
+        retcode = None
+        if self.has_retcode and body_end - payload_start >= 4:
+            candidate = UINT32.unpack_from(self._buf, payload_start)[0]
+            if not candidate & 0xFFFFFF00:
+                retcode = candidate
+                payload_start += 4
+
+        self._start = end
+        return TuyaFrame(seqno, cmd, retcode, view[payload_start:body_end], verified)
+
+    def _decode_6699(self):
+        start = self._start
+        if self._end - start < HEADER_6699.size:
+            return None
+        _, _, seqno, cmd, length = HEADER_6699.unpack_from(self._buf, start)
+        if not self._check_length(length):
+            return False
+        total = HEADER_6699.size + length + 4
+        if self._end - start < total:
+            return None
+
+        end = start + total
+        if length < GCM_IV_SIZE + GCM_TAG_SIZE or UINT32.unpack_from(self._buf, end - 4)[0] != SUFFIX_6699:
+            self._resync()
+            return False
+
+        iv_start = start + HEADER_6699.size
+        tag_start = end - 4 - GCM_TAG_SIZE
+        self._start = end
+        if self._aead is None:
+            return TuyaFrame(seqno, cmd, None, self._view[iv_start + GCM_IV_SIZE:tag_start], None)
+
+        try:
+            plain = self._aead.decrypt(
+                bytes(self._view[iv_start:iv_start + GCM_IV_SIZE]),
+                bytes(self._view[iv_start + GCM_IV_SIZE:end - 4]),
+                bytes(self._view[start + 4:start + HEADER_6699.size]),
+            )
+        except Exception:
+            return TuyaFrame(seqno, cmd, None, self._view[iv_start + GCM_IV_SIZE:tag_start], False)
+
+        payload = memoryview(plain)
+        retcode = None
+        if self.has_retcode and len(plain) >= 4:
+            candidate = UINT32.unpack_from(plain, 0)[0]
+            if not candidate & 0xFFFFFF00:
+                retcode = candidate
+                payload = payload[4:]
+        return TuyaFrame(seqno, cmd, retcode, payload, True)
+
+
+class FrameEncoder:
+    """Encode frames with pack_into - into a caller buffer or a fresh bytes"""
+
+    def __init__(self, version: float = 3.4, key: Optional[bytes] = None):
+        self.version = float(version)
+        self.key = key
+        self._aead = _aesgcm(key) if self.version >= 3.5 else None
+
+    def frame_size(self, payload_len: int, retcode: Optional[int] = None) -> int:
+        body = payload_len + (4 if retcode is not None else 0)
+        if self.version >= 3.5:
+            return HEADER_6699.size + GCM_IV_SIZE + body + GCM_TAG_SIZE + 4
+        return HEADER_55AA.size + body + (HMAC_SIZE if self.version >= 3.4 else CRC_SIZE) + 4
+
+    def encode_into(self, buf, offset: int, seqno: int, cmd: int, payload, retcode: Optional[int] = None,
+                    iv: Optional[bytes] = None) -> int:
+        """Write one frame at buf[offset:], return its size"""
+        view = memoryview(buf)
+        size = self.frame_size(len(payload), retcode)
+        if self.version >= 3.5:
+            return self._encode_6699(view, offset, size, seqno, cmd, payload, retcode, iv)
+
+        check_size = HMAC_SIZE if self.version >= 3.4 else CRC_SIZE
+        HEADER_55AA.pack_into(buf, offset, PREFIX_55AA, seqno, cmd, size - HEADER_55AA.size)
+        pos = offset + HEADER_55AA.size
+        if retcode is not None:
+            UINT32.pack_into(buf, pos, retcode)
+            pos += 4
+        view[pos:pos + len(payload)] = payload
+        pos += len(payload)
+        signed = view[offset:pos]
+        if check_size == HMAC_SIZE:
+            if not self.key:
+                raise FrameError("protocol 3.4 needs a key for the HMAC")
+            view[pos:pos + HMAC_SIZE] = hmac.new(self.key, signed, hashlib.sha256).digest()
+        else:
+            UINT32.pack_into(buf, pos, zlib.crc32(signed) & 0xFFFFFFFF)
+        UINT32.pack_into(buf, pos + check_size, SUFFIX_55AA)
+        return size
+
+    def _encode_6699(self, view, offset, size, seqno, cmd, payload, retcode, iv):
+        HEADER_6699.pack_into(view, offset, PREFIX_6699, 0, seqno, cmd, size - HEADER_6699.size - 4)
+        plain = bytes(payload) if retcode is None else UINT32.pack(retcode) + bytes(payload)
+        iv = iv or os.urandom(GCM_IV_SIZE)
+        aad = bytes(view[offset + 4:offset + HEADER_6699.size])
+        sealed = self._aead.encrypt(iv, plain, aad)
+        pos = offset + HEADER_6699.size
+        view[pos:pos + GCM_IV_SIZE] = iv
+        pos += GCM_IV_SIZE
+        view[pos:pos + len(sealed)] = sealed
+        UINT32.pack_into(view, pos + len(sealed), SUFFIX_6699)
+        return size
+
+    def encode(self, seqno: int, cmd: int, payload, retcode: Optional[int] = None,
+               iv: Optional[bytes] = None) -> bytes:
+        buf = bytearray(self.frame_size(len(payload), retcode))
+        self.encode_into(buf, 0, seqno, cmd, payload, retcode, iv)
+        return bytes(buf)